@@ -0,0 +1,201 @@
+"""
+Redis-backed response cache for the analytical endpoints
+
+The warehouse only changes when dbt runs, so aggregate responses can be
+served from Redis between runs. Every key includes the current warehouse
+version; the pipeline bumps it after each successful dbt run via
+bump_warehouse_version(), and entries from older versions simply expire.
+"""
+import hashlib
+import logging
+import os
+from contextvars import ContextVar
+from decimal import Decimal
+from typing import Any, Callable, Optional, Tuple
+
+import orjson
+from dotenv import load_dotenv
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.coder import Coder
+from pydantic import BaseModel
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from starlette.requests import Request
+from starlette.responses import Response
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_PREFIX = "mtw-cache"
+WAREHOUSE_VERSION_KEY = "mtw:warehouse_version"
+CACHE_EXPIRE = int(os.getenv("CACHE_EXPIRE_SECONDS", "86400"))
+SEARCH_CACHE_EXPIRE = int(os.getenv("SEARCH_CACHE_EXPIRE_SECONDS", "600"))
+
+# Response of the request currently being served, so the backend can
+# report whether the lookup was a hit or a miss
+_current_response: ContextVar[Optional[Response]] = ContextVar("_current_response", default=None)
+
+
+class ObservedRedisBackend(RedisBackend):
+    """Redis backend that tags responses with an X-Cache: HIT/MISS header"""
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[str]]:
+        ttl, value = await super().get_with_ttl(key)
+        response = _current_response.get()
+        if response is not None:
+            response.headers["X-Cache"] = "HIT" if value is not None else "MISS"
+        return ttl, value
+
+    async def get_warehouse_version(self) -> str:
+        version = await self.redis.get(WAREHOUSE_VERSION_KEY)
+        return version.decode() if version is not None else "0"
+
+
+def _orjson_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONCoder(Coder):
+    """
+    Cache coder built on orjson
+
+    The default JsonCoder goes through the stdlib encoder and calls
+    jsonable_encoder on every response model. Cached values are plain JSON
+    here; the route's response_model parses dates back on the way out.
+    """
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        return orjson.dumps(value, default=_orjson_default)
+
+    @classmethod
+    def decode(cls, value: bytes) -> Any:
+        return orjson.loads(value)
+
+
+class RawJSONCoder(ORJSONCoder):
+    """
+    Cache coder that serves hits as the stored JSON bytes
+
+    For endpoints with large nested payloads, a hit skips parsing,
+    response_model validation and re-encoding. Headers the cache set on the
+    request's response (ETag, Cache-Control, X-Cache) are carried over.
+    """
+
+    @classmethod
+    def decode(cls, value: bytes) -> Response:
+        response = Response(content=value, media_type="application/json")
+        current = _current_response.get()
+        if current is not None:
+            for header in ("Cache-Control", "ETag", "X-Cache"):
+                if header in current.headers:
+                    response.headers[header] = current.headers[header]
+        return response
+
+
+async def get_warehouse_version() -> str:
+    """
+    Return the warehouse version the cached responses belong to
+
+    Runs inside the key builders, where fastapi-cache does not catch backend
+    errors, so an unreachable Redis falls back to version "0"; the cache
+    get/set that follow fail softly and the request is served from the
+    database.
+    """
+    backend = FastAPICache.get_backend()
+    if isinstance(backend, ObservedRedisBackend):
+        try:
+            return await backend.get_warehouse_version()
+        except (RedisError, ConnectionError, OSError) as e:
+            logger.warning(f"Could not read the warehouse version from Redis: {e}")
+    return "0"
+
+
+async def request_key_builder(
+    func: Callable,
+    namespace: Optional[str] = "",
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: Optional[tuple] = None,
+    kwargs: Optional[dict] = None,
+) -> str:
+    """Build a cache key from the warehouse version, request path and sorted query parameters"""
+    _current_response.set(response)
+    version = await get_warehouse_version()
+
+    if request is not None:
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.items()))
+        raw_key = f"{request.url.path}?{params}"
+    else:
+        raw_key = f"{func.__module__}:{func.__name__}:{args}:{kwargs}"
+
+    digest = hashlib.md5(raw_key.encode()).hexdigest()
+    return f"{FastAPICache.get_prefix()}:{version}:{namespace}:{digest}"
+
+
+def normalize_search_query(query: str) -> str:
+    """Lowercase a search query and collapse its whitespace"""
+    return " ".join(query.lower().split())
+
+
+async def search_key_builder(
+    func: Callable,
+    namespace: Optional[str] = "",
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: Optional[tuple] = None,
+    kwargs: Optional[dict] = None,
+) -> str:
+    """
+    Build a cache key from the warehouse version, normalized search query and limit
+
+    plainto_tsquery('simple', ...) ignores case and spacing, so queries such
+    as " Paracetamol" and "PARACETAMOL" return the same rows and share a key.
+    """
+    _current_response.set(response)
+    version = await get_warehouse_version()
+
+    kwargs = kwargs or {}
+    query = normalize_search_query(str(kwargs.get("query", "")))
+    raw_key = f"{func.__name__}|{query}|{kwargs.get('limit')}"
+
+    digest = hashlib.sha256(raw_key.encode()).hexdigest()
+    return f"{FastAPICache.get_prefix()}:{version}:{namespace}:{digest}"
+
+
+def init_cache(redis_url: Optional[str] = None):
+    """Initialize FastAPICache with the Redis backend"""
+    redis = aioredis.from_url(redis_url or REDIS_URL)
+    FastAPICache.init(
+        ObservedRedisBackend(redis),
+        prefix=CACHE_PREFIX,
+        expire=CACHE_EXPIRE,
+        coder=ORJSONCoder,
+        key_builder=request_key_builder,
+    )
+
+
+def bump_warehouse_version(version: str, redis_url: Optional[str] = None):
+    """
+    Point the API cache at a new warehouse version
+
+    Keys are scoped by version, so this takes effect atomically for every
+    API replica without scanning or deleting existing entries.
+
+    Args:
+        version: Identifier of the warehouse build (e.g. the pipeline run ID)
+    """
+    import redis
+
+    client = redis.Redis.from_url(redis_url or REDIS_URL)
+    try:
+        client.set(WAREHOUSE_VERSION_KEY, version)
+    finally:
+        client.close()
@@ -1,15 +1,27 @@
 """
 FastAPI main application
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 from api.database import engine, Base
 from api import schemas
 from api import analytics
+from api.cache import init_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create database tables and initialize the Redis response cache on startup"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    init_cache()
+    yield
+    await engine.dispose()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Medical Telegram Warehouse API",
@@ -19,9 +31,12 @@ app = FastAPI(
     ## Features
     
     * **Top Products**: Find most frequently mentioned products/terms
+    * **Channel Stats**: Summary statistics for every channel
     * **Channel Activity**: Get detailed statistics for specific channels
     * **Message Search**: Search messages by keyword
     * **Visual Content Stats**: Analyze image usage and YOLO detection results
+    * **Product Types**: Message volume and engagement by inferred product type
+    * **Posting Trends**: Daily posting activity per channel
     
     ## Data Sources
     
@@ -32,7 +47,9 @@ app = FastAPI(
     """,
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -57,10 +74,13 @@ async def root():
         "version": "1.0.0",
         "description": "Analytical API for medical Telegram data warehouse",
         "endpoints": {
-            "top_products": "/api/reports/top-products?limit=10",
+            "top_products": "/api/reports/top-products?limit=10&offset=0",
+            "channel_stats": "/api/channels",
             "channel_activity": "/api/channels/{channel_name}/activity",
             "search_messages": "/api/search/messages?query=keyword&limit=20",
             "visual_content": "/api/reports/visual-content",
+            "product_types": "/api/reports/product-types",
+            "posting_trends": "/api/reports/posting-trends?days=30",
             "docs": "/docs",
             "health": "/health"
         },
@@ -77,11 +97,10 @@ async def health_check():
     
     Returns API and database connection status
     """
-    from api.database import engine
     try:
         # Test database connection
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         return {
             "status": "healthy",
             "database": "connected",
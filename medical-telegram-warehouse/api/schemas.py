@@ -3,8 +3,33 @@ Pydantic models for API request/response validation
 Task 4 - Analytical API
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import datetime
+from typing import Dict, Literal, Optional, List
+from typing_extensions import TypedDict
+from datetime import date, datetime
+
+
+# YOLO image categories (see fct_image_detections)
+ImageCategory = Literal["promotional", "product_display", "lifestyle", "other"]
+
+
+class CategoryEngagement(TypedDict):
+    """Average engagement for one image category"""
+    avg_views: float
+    avg_forwards: float
+
+
+class DetectedObjectCount(TypedDict):
+    """Number of images containing a detected object class"""
+    object_name: str
+    count: int
+
+
+class ChannelVisualStats(TypedDict):
+    """Image detection summary for one channel"""
+    channel_name: str
+    images_analyzed: int
+    avg_objects: float
+    avg_confidence: float
 
 
 # ============================================================================
@@ -60,6 +85,34 @@ class ChannelActivity(BaseModel):
         }
 
 
+class ChannelStats(BaseModel):
+    """Schema for per-channel summary statistics"""
+    channel_name: str = Field(..., description="Channel name")
+    channel_type: str = Field(..., description="Channel classification")
+    total_posts: int = Field(..., description="Total number of posts")
+    messages_with_media: int = Field(..., description="Number of messages with media")
+    media_ratio: float = Field(..., description="Ratio of messages with media")
+    avg_views: float = Field(..., description="Average views per message")
+    avg_forwards: float = Field(..., description="Average forwards per message")
+    first_post_date: Optional[datetime] = Field(None, description="Date of first post")
+    last_post_date: Optional[datetime] = Field(None, description="Date of last post")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "channel_name": "chemed123",
+                "channel_type": "Other",
+                "total_posts": 76,
+                "messages_with_media": 72,
+                "media_ratio": 0.95,
+                "avg_views": 1418.82,
+                "avg_forwards": 3.16,
+                "first_post_date": "2022-09-05T08:35:59",
+                "last_post_date": "2023-02-10T12:23:06"
+            }
+        }
+
+
 class MessageSearchResult(BaseModel):
     """Schema for message search result"""
     message_id: int = Field(..., description="Message ID")
@@ -69,7 +122,7 @@ class MessageSearchResult(BaseModel):
     view_count: int = Field(..., description="Number of views")
     forward_count: int = Field(..., description="Number of forwards")
     has_image: bool = Field(..., description="Whether message has an image")
-    image_category: Optional[str] = Field(None, description="YOLO image category if available")
+    image_category: Optional[ImageCategory] = Field(None, description="YOLO image category if available")
     
     class Config:
         json_schema_extra = {
@@ -89,13 +142,13 @@ class MessageSearchResult(BaseModel):
 class VisualContentStats(BaseModel):
     """Schema for visual content statistics"""
     total_images_analyzed: int = Field(..., description="Total number of images analyzed")
-    images_by_category: dict = Field(..., description="Count of images by category")
-    category_percentages: dict = Field(..., description="Percentage distribution by category")
+    images_by_category: Dict[ImageCategory, int] = Field(..., description="Count of images by category")
+    category_percentages: Dict[ImageCategory, float] = Field(..., description="Percentage distribution by category")
     avg_objects_per_image: float = Field(..., description="Average objects detected per image")
     avg_confidence_score: float = Field(..., description="Average confidence score")
-    engagement_by_category: dict = Field(..., description="Average views by image category")
-    top_detected_objects: List[dict] = Field(..., description="Top detected objects")
-    channel_stats: List[dict] = Field(..., description="Visual content stats by channel")
+    engagement_by_category: Dict[ImageCategory, CategoryEngagement] = Field(..., description="Average views by image category")
+    top_detected_objects: List[DetectedObjectCount] = Field(..., description="Top detected objects")
+    channel_stats: List[ChannelVisualStats] = Field(..., description="Visual content stats by channel")
     
     class Config:
         json_schema_extra = {
@@ -119,6 +172,44 @@ class VisualContentStats(BaseModel):
         }
 
 
+class ProductTypeStats(BaseModel):
+    """Schema for product type distribution response"""
+    product_type: str = Field(..., description="Inferred product type")
+    message_count: int = Field(..., description="Number of messages of this type")
+    avg_views: float = Field(..., description="Average views per message")
+    avg_forwards: float = Field(..., description="Average forwards per message")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "product_type": "cream",
+                "message_count": 42,
+                "avg_views": 980.25,
+                "avg_forwards": 2.1
+            }
+        }
+
+
+class PostingTrend(BaseModel):
+    """Schema for daily posting trend response"""
+    post_date: date = Field(..., description="Calendar date")
+    channel_name: str = Field(..., description="Channel name")
+    post_count: int = Field(..., description="Number of posts on this date")
+    media_count: int = Field(..., description="Number of posts with media on this date")
+    avg_views: float = Field(..., description="Average views of posts on this date")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "post_date": "2023-02-10",
+                "channel_name": "chemed123",
+                "post_count": 4,
+                "media_count": 3,
+                "avg_views": 1327.0
+            }
+        }
+
+
 class ErrorResponse(BaseModel):
     """Schema for error responses"""
     error: str = Field(..., description="Error message")
@@ -1,4 +1,10 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='table',
+    indexes=[
+        {'columns': ['channel_key'], 'unique': True},
+        {'columns': ['channel_name']}
+    ]
+) }}
 
 WITH channel_stats AS (
     SELECT
@@ -1,4 +1,10 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='table',
+    indexes=[
+        {'columns': ['date_key'], 'unique': True},
+        {'columns': ['full_date']}
+    ]
+) }}
 
 WITH date_spine AS (
     SELECT 
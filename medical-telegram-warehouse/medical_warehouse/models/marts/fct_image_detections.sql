@@ -1,4 +1,16 @@
-{{ config(materialized='table') }}
+{#- The INCLUDE index can't go in `indexes`, so its fixed name is dropped
+    from the __dbt_backup table before it is recreated on the new one -#}
+{{ config(
+    materialized='table',
+    indexes=[
+        {'columns': ['detected_objects'], 'type': 'gin'},
+        {'columns': ['message_id'], 'unique': True}
+    ],
+    post_hook=[
+        "DROP INDEX IF EXISTS {{ this.schema }}.fct_image_detections_category",
+        "CREATE INDEX fct_image_detections_category ON {{ this }} (image_category_key) INCLUDE (view_count, forward_count, detection_count, confidence_score)"
+    ]
+) }}
 
 /*
 Fact table for image detections from YOLO analysis
@@ -16,7 +28,9 @@ WITH enriched_data AS (
         confidence_score,
         has_person,
         has_product,
-        detected_objects,
+        -- Comma-separated YOLO class names -> text[] so queries can UNNEST
+        -- or use ANY()/@> against the GIN index without re-parsing
+        STRING_TO_ARRAY(NULLIF(TRIM(detected_objects), ''), ',')::TEXT[] as detected_objects,
         detections_json
     FROM {{ source('raw', 'enriched_messages') }}
     WHERE image_path IS NOT NULL
@@ -40,6 +54,7 @@ SELECT
     -- Foreign keys
     fm.channel_key,
     fm.date_key,
+    ic.image_category_key,
     
     -- Image detection metrics
     ed.detection_count,
@@ -60,4 +75,6 @@ SELECT
 FROM enriched_data ed
 INNER JOIN fact_messages fm
     ON ed.message_id = fm.message_id
+LEFT JOIN {{ ref('dim_image_categories') }} ic
+    ON ic.image_category = COALESCE(ed.image_category, 'other')
 WHERE fm.has_image = TRUE  -- Only include messages that have images
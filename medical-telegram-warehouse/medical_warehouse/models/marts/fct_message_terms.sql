@@ -0,0 +1,42 @@
+{{ config(
+    materialized='table',
+    indexes=[
+        {'columns': ['term']},
+        {'columns': ['channel_key', 'term']}
+    ]
+) }}
+
+/*
+One row per term occurrence so the top-products endpoint can aggregate
+pre-tokenized terms instead of splitting every message on each request.
+Tokenizing matches the original endpoint query: split on single spaces,
+and a message repeating a term contributes one row per repetition.
+channel_name is denormalized to avoid a join on the hot query.
+*/
+
+WITH message_terms AS (
+    SELECT
+        UNNEST(STRING_TO_ARRAY(LOWER(fm.message_text), ' ')) as term,
+        fm.message_id,
+        fm.channel_key,
+        fm.view_count
+    FROM {{ ref('fct_messages') }} fm
+    WHERE fm.message_text IS NOT NULL
+        AND LENGTH(fm.message_text) > 0
+)
+
+SELECT
+    mt.term,
+    mt.message_id,
+    mt.channel_key,
+    dc.channel_name,
+    mt.view_count
+FROM message_terms mt
+JOIN {{ ref('dim_channels') }} dc
+    ON mt.channel_key = dc.channel_key
+WHERE LENGTH(mt.term) > 3
+    AND NOT EXISTS (
+        SELECT 1
+        FROM {{ ref('dim_stopwords') }} sw
+        WHERE sw.word = mt.term
+    )
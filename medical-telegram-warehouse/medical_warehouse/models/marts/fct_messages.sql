@@ -1,4 +1,20 @@
-{{ config(materialized='table') }}
+{#- Expression and partial indexes can't go in `indexes`, so they use fixed
+    names. dbt's table swap leaves those names on the __dbt_backup table, so
+    each one is dropped before it is recreated on the new table. -#}
+{{ config(
+    materialized='table',
+    indexes=[
+        {'columns': ['channel_key', 'message_date']}
+    ],
+    post_hook=[
+        "DROP INDEX IF EXISTS {{ this.schema }}.fct_messages_fts",
+        "CREATE INDEX fct_messages_fts ON {{ this }} USING GIN (to_tsvector('simple', message_text))",
+        "DROP INDEX IF EXISTS {{ this.schema }}.fct_messages_price_mentions",
+        "CREATE INDEX fct_messages_price_mentions ON {{ this }} (channel_key) WHERE mentions_price",
+        "DROP INDEX IF EXISTS {{ this.schema }}.fct_messages_preview",
+        "CREATE INDEX fct_messages_preview ON {{ this }} (message_preview) INCLUDE (view_count) WHERE message_length > 10"
+    ]
+) }}
 
 SELECT
     -- Primary key
@@ -10,6 +26,9 @@ SELECT
     
     -- Message content
     sm.message_text,
+    -- Grouping key for repeated posts; covered by a partial index so the
+    -- top-products aggregate can run as an index-only scan
+    LEFT(sm.message_text, 100) as message_preview,
     sm.message_length,
     sm.has_text,
     
@@ -23,11 +42,9 @@ SELECT
     sm.forwards as forward_count,
     
     -- Business logic fields
-    CASE 
-        WHEN sm.message_text ILIKE '%price%' OR sm.message_text ILIKE '%birr%' 
-             OR sm.message_text ILIKE '%etb%' OR sm.message_text ILIKE '%cost%' THEN TRUE 
-        ELSE FALSE 
-    END as mentions_price,
+    -- One case-insensitive regex pass instead of four ILIKE scans; same
+    -- substring semantics. Partially indexed for price-mention lookups
+    COALESCE(sm.message_text ~* '(price|birr|etb|cost)', FALSE) as mentions_price,
     
     CASE 
         WHEN sm.message_text ILIKE '%pill%' OR sm.message_text ILIKE '%tablet%' 
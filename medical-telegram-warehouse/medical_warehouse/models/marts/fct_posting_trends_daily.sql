@@ -0,0 +1,27 @@
+{#- The mixed-direction index can't go in `indexes`, so its fixed name is
+    dropped from the __dbt_backup table before it is recreated -#}
+{{ config(
+    materialized='table',
+    post_hook=[
+        "DROP INDEX IF EXISTS {{ this.schema }}.fct_posting_trends_daily_date",
+        "CREATE INDEX fct_posting_trends_daily_date ON {{ this }} (post_date DESC, channel_name)"
+    ]
+) }}
+
+/*
+Daily posting activity per channel for the posting-trends API endpoint.
+Rebuilt in full on every dbt run (rather than incrementally) because view
+counts on older messages keep changing as channels are re-scraped.
+*/
+
+SELECT
+    DATE(fm.message_date) as post_date,
+    dc.channel_key,
+    dc.channel_name,
+    COUNT(*) as post_count,
+    COUNT(*) FILTER (WHERE fm.has_media) as media_count,
+    COALESCE(ROUND(AVG(fm.view_count)::NUMERIC, 2), 0) as avg_views
+FROM {{ ref('fct_messages') }} fm
+JOIN {{ ref('dim_channels') }} dc
+    ON fm.channel_key = dc.channel_key
+GROUP BY DATE(fm.message_date), dc.channel_key, dc.channel_name
@@ -0,0 +1,27 @@
+{{ config(
+    materialized='table',
+    indexes=[
+        {'columns': ['channel_key'], 'unique': True}
+    ]
+) }}
+
+/*
+Message counts and engagement totals per channel, shared by the price
+mention, visual content and summary sections of the notebook analysis.
+Kept as a table: a view would be dropped by the CASCADE when
+fct_messages or dim_channels is rebuilt, while a table is swapped in
+after them and the notebook reads the previous build in the meantime.
+*/
+
+SELECT
+    fm.channel_key,
+    dc.channel_name,
+    dc.channel_type,
+    COUNT(*) as total_messages,
+    COUNT(*) FILTER (WHERE fm.mentions_price) as price_mentions,
+    COUNT(*) FILTER (WHERE fm.has_image) as image_messages,
+    SUM(fm.view_count) as total_views,
+    SUM(fm.forward_count) as total_forwards
+FROM {{ ref('fct_messages') }} fm
+JOIN {{ ref('dim_channels') }} dc ON fm.channel_key = dc.channel_key
+GROUP BY fm.channel_key, dc.channel_name, dc.channel_type
@@ -0,0 +1,29 @@
+{{ config(
+    materialized='table',
+    indexes=[
+        {'columns': ['channel_name'], 'unique': True}
+    ]
+) }}
+
+/*
+Share of each channel's messages with YOLO detections, for the image
+content analysis.
+Materialized as a table for the same reason as mv_image_category_stats:
+it stays readable while its parents are rebuilt.
+*/
+
+SELECT 
+    dc.channel_name,
+    dc.channel_type,
+    COUNT(DISTINCT fm.message_id) as total_messages,
+    COUNT(DISTINCT fid.message_id) as messages_with_detections,
+    ROUND(
+        COUNT(DISTINCT fid.message_id)::NUMERIC / 
+        NULLIF(COUNT(DISTINCT fm.message_id), 0) * 100, 
+        2
+    ) as detection_coverage_pct,
+    ROUND(AVG(fid.detection_count)::NUMERIC, 2) as avg_objects_per_image
+FROM {{ ref('dim_channels') }} dc
+LEFT JOIN {{ ref('fct_messages') }} fm ON dc.channel_key = fm.channel_key
+LEFT JOIN {{ ref('fct_image_detections') }} fid ON fm.message_id = fid.message_id
+GROUP BY dc.channel_name, dc.channel_type
@@ -0,0 +1,21 @@
+{{ config(
+    materialized='table',
+    indexes=[
+        {'columns': ['detected_objects'], 'unique': True},
+        {'columns': ['image_count']}
+    ]
+) }}
+
+/*
+How often each combination of detected objects occurs across images, for
+the image content analysis.
+Materialized as a table (see mv_image_category_stats) so it stays
+readable while fct_image_detections is rebuilt.
+*/
+
+SELECT 
+    detected_objects,
+    COUNT(*) as image_count
+FROM {{ ref('fct_image_detections') }}
+WHERE detected_objects IS NOT NULL
+GROUP BY detected_objects
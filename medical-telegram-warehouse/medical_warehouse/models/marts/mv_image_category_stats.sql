@@ -0,0 +1,42 @@
+{{ config(
+    materialized='table',
+    indexes=[
+        {'columns': ['image_category'], 'unique': True}
+    ]
+) }}
+
+/*
+Engagement, detection and confidence metrics per image category for the
+image content analysis (scripts/analyze_image_content.py). Grouped on the
+SMALLINT category key; the name is joined in afterwards for display.
+A table rather than a materialized view so the CASCADE drop of a rebuilt
+fct_image_detections leaves it alone; dbt swaps in the new build after
+its parents (refresh_image_detection_models selects
+fct_image_detections+), and the script reads the previous one meanwhile.
+*/
+
+WITH category_stats AS (
+    SELECT
+        image_category_key,
+        COUNT(*) as message_count,
+        ROUND(COUNT(*)::NUMERIC / SUM(COUNT(*)) OVER () * 100, 2) as percentage,
+        ROUND(AVG(view_count)::NUMERIC, 2) as avg_views,
+        ROUND(AVG(forward_count)::NUMERIC, 2) as avg_forwards,
+        ROUND(MIN(view_count)::NUMERIC, 2) as min_views,
+        ROUND(MAX(view_count)::NUMERIC, 2) as max_views,
+        ROUND(SUM(view_count)::NUMERIC, 0) as total_views,
+        ROUND(AVG(detection_count)::NUMERIC, 2) as avg_objects,
+        ROUND(AVG(confidence_score)::NUMERIC, 3) as avg_confidence,
+        ROUND(MIN(confidence_score)::NUMERIC, 3) as min_confidence,
+        ROUND(MAX(confidence_score)::NUMERIC, 3) as max_confidence,
+        COUNT(CASE WHEN confidence_score < 0.3 THEN 1 END) as low_confidence_count
+    FROM {{ ref('fct_image_detections') }}
+    GROUP BY image_category_key
+)
+
+SELECT
+    ic.image_category,
+    cs.*
+FROM category_stats cs
+JOIN {{ ref('dim_image_categories') }} ic
+    ON cs.image_category_key = ic.image_category_key
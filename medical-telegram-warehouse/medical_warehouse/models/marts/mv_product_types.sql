@@ -0,0 +1,22 @@
+{{ config(
+    materialized='table',
+    indexes=[
+        {'columns': ['product_type'], 'unique': True}
+    ]
+) }}
+
+/*
+Message volume and engagement per product type for the product-types
+API endpoint. A table, like mv_top_products, so it survives the rebuild
+of fct_messages and keeps serving the last build until dbt swaps in the
+next one.
+*/
+
+SELECT
+    product_type,
+    COUNT(*) as message_count,
+    ROUND(AVG(view_count)::NUMERIC, 2) as avg_views,
+    ROUND(AVG(forward_count)::NUMERIC, 2) as avg_forwards
+FROM {{ ref('fct_messages') }}
+WHERE product_type IS NOT NULL
+GROUP BY product_type
@@ -0,0 +1,26 @@
+{{ config(
+    materialized='table',
+    indexes=[
+        {'columns': ['term'], 'unique': True},
+        {'columns': ['mention_count', 'avg_views']}
+    ]
+) }}
+
+/*
+Term ranking served by the top-products API endpoint, which pages
+through it with ORDER BY ... LIMIT/OFFSET instead of aggregating
+fct_message_terms.
+Built as a table rather than a materialized view: rebuilding a parent
+table drops the old one with CASCADE, which would take a view with it.
+dbt swaps this table in atomically after its parents, so readers see the
+previous snapshot until the new one is ready.
+*/
+
+SELECT
+    term,
+    COUNT(DISTINCT message_id) as mention_count,
+    ROUND(AVG(view_count)::NUMERIC, 2) as avg_views,
+    ARRAY_AGG(DISTINCT channel_name) as channels
+FROM {{ ref('fct_message_terms') }}
+GROUP BY term
+HAVING COUNT(DISTINCT message_id) >= 2
@@ -0,0 +1,104 @@
+{{ config(
+    materialized='table',
+    indexes=[
+        {'columns': ['stats_key'], 'unique': True}
+    ]
+) }}
+
+/*
+Single-row VisualContentStats payload for the visual-content API endpoint.
+The endpoint reads one precomputed row instead of aggregating
+fct_image_detections per request. Materialized as a table (see mv_top_products): the previous
+payload stays readable while fct_image_detections is rebuilt.
+*/
+
+WITH base AS (
+    SELECT 
+        message_id,
+        channel_key,
+        detection_count,
+        confidence_score,
+        image_category_key,
+        detected_objects,
+        view_count,
+        forward_count
+    FROM {{ ref('fct_image_detections') }}
+),
+overall AS (
+    SELECT 
+        COUNT(*) as total_images,
+        COALESCE(ROUND(AVG(detection_count)::NUMERIC, 2), 0) as avg_objects,
+        COALESCE(ROUND(AVG(confidence_score)::NUMERIC, 3), 0) as avg_confidence
+    FROM base
+),
+categories AS (
+    SELECT 
+        ic.image_category,
+        cs.count,
+        cs.percentage,
+        cs.avg_views,
+        cs.avg_forwards
+    FROM (
+        SELECT 
+            image_category_key,
+            COUNT(*) as count,
+            ROUND(COUNT(*)::NUMERIC / SUM(COUNT(*)) OVER () * 100, 1) as percentage,
+            COALESCE(ROUND(AVG(view_count)::NUMERIC, 2), 0) as avg_views,
+            COALESCE(ROUND(AVG(forward_count)::NUMERIC, 2), 0) as avg_forwards
+        FROM base
+        GROUP BY image_category_key
+    ) cs
+    JOIN {{ ref('dim_image_categories') }} ic
+        ON cs.image_category_key = ic.image_category_key
+)
+SELECT
+    1 as stats_key,
+    json_build_object(
+        'total_images_analyzed', o.total_images,
+        'avg_objects_per_image', o.avg_objects,
+        'avg_confidence_score', o.avg_confidence,
+        'images_by_category', (
+            SELECT COALESCE(json_object_agg(image_category, count ORDER BY count DESC), '{}'::json)
+            FROM categories
+        ),
+        'category_percentages', (
+            SELECT COALESCE(json_object_agg(image_category, percentage ORDER BY count DESC), '{}'::json)
+            FROM categories
+        ),
+        'engagement_by_category', (
+            SELECT COALESCE(
+                json_object_agg(
+                    image_category,
+                    json_build_object('avg_views', avg_views, 'avg_forwards', avg_forwards)
+                ),
+                '{}'::json
+            )
+            FROM categories
+        ),
+        'top_detected_objects', (
+            SELECT COALESCE(json_agg(t ORDER BY t.count DESC), '[]'::json)
+            FROM (
+                SELECT 
+                    object_name,
+                    COUNT(*) as count
+                FROM base, UNNEST(detected_objects) as object_name
+                GROUP BY object_name
+                ORDER BY count DESC
+                LIMIT 10
+            ) t
+        ),
+        'channel_stats', (
+            SELECT COALESCE(json_agg(cs ORDER BY cs.images_analyzed DESC), '[]'::json)
+            FROM (
+                SELECT 
+                    dc.channel_name,
+                    COUNT(b.message_id) as images_analyzed,
+                    COALESCE(ROUND(AVG(b.detection_count)::NUMERIC, 2), 0) as avg_objects,
+                    COALESCE(ROUND(AVG(b.confidence_score)::NUMERIC, 3), 0) as avg_confidence
+                FROM base b
+                JOIN {{ ref('dim_channels') }} dc ON b.channel_key = dc.channel_key
+                GROUP BY dc.channel_name
+            ) cs
+        )
+    ) as payload
+FROM overall o
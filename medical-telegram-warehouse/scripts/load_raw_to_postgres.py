@@ -2,6 +2,7 @@
 Task 2 - Load Raw Data to PostgreSQL
 Loads JSON files from data lake into raw.telegram_messages table
 """
+import os
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -10,17 +11,19 @@ from datetime import datetime
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.loader.postgres_loader import PostgresLoader
 
-
-def load_all_from_data_lake(base_path: str = "data", date_str: str = None):
+def load_all_from_data_lake(base_path: str = "data", date_str: str = None, workers: int = None):
     """
     Load all JSON files from data lake to PostgreSQL raw schema
     
     Args:
         base_path: Base directory for data
         date_str: Date string (YYYY-MM-DD), defaults to today
+        workers: Number of JSON parser processes (defaults to CPU count)
     """
+    # Imported here so --help doesn't load SQLAlchemy
+    from src.loader.postgres_loader import PostgresLoader
+    
     if date_str is None:
         date_str = datetime.now().strftime("%Y-%m-%d")
     
@@ -39,7 +42,7 @@ def load_all_from_data_lake(base_path: str = "data", date_str: str = None):
         # Load from today's directory
         json_dir = Path(base_path) / "raw" / "telegram_messages" / date_str
         if json_dir.exists():
-            loader.load_from_directory(json_dir)
+            loader.load_from_directory(json_dir, workers=workers)
         else:
             print(f"Warning: Directory not found: {json_dir}")
             print("Trying to load from all available dates...")
@@ -48,9 +51,8 @@ def load_all_from_data_lake(base_path: str = "data", date_str: str = None):
             base_json_dir = Path(base_path) / "raw" / "telegram_messages"
             if base_json_dir.exists():
                 date_dirs = [d for d in base_json_dir.iterdir() if d.is_dir()]
-                for date_dir in date_dirs:
-                    print(f"\nLoading from {date_dir.name}...")
-                    loader.load_from_directory(date_dir)
+                # One pool and one COPY across every date, not one per directory
+                loader.load_from_directories(date_dirs, workers=workers)
         
         # Get final count
         count = loader.get_table_count("raw.telegram_messages")
@@ -84,7 +86,13 @@ if __name__ == "__main__":
         default="data",
         help="Base directory for data storage"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of processes used to parse JSON files. Defaults to CPU count."
+    )
     
     args = parser.parse_args()
     
-    load_all_from_data_lake(base_path=args.base_path, date_str=args.date)
+    load_all_from_data_lake(base_path=args.base_path, date_str=args.date, workers=args.workers)
@@ -4,7 +4,10 @@ Task 3 - Data Enrichment
 """
 import sys
 import csv
+import io
 from pathlib import Path
+from typing import Dict, List, Set, Tuple
+import orjson
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 import os
@@ -42,6 +45,162 @@ def create_enriched_table(engine):
         print("Raw.enriched_messages table created/verified")
 
 
+def fetch_enriched_keys(database_url: str) -> Set[Tuple[str, int]]:
+    """
+    Return the (channel_name, message_id) pairs already in raw.enriched_messages
+    
+    Passed to YOLODetector.scan_and_process_images so incremental runs
+    only run detection on images that arrived since the last load.
+    
+    Args:
+        database_url: PostgreSQL connection URL
+    
+    Returns:
+        Set of enriched (channel_name, message_id) pairs; empty if the
+        table does not exist yet
+    """
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            if conn.execute(text("SELECT to_regclass('raw.enriched_messages')")).scalar() is None:
+                return set()
+            result = conn.execute(text(
+                "SELECT channel_name, message_id FROM raw.enriched_messages"
+            ))
+            return {(channel_name, message_id) for channel_name, message_id in result}
+    finally:
+        engine.dispose()
+
+
+def copy_enriched_rows(engine, rows) -> int:
+    """
+    Bulk-upsert detection rows into raw.enriched_messages
+    
+    Rows are COPYed into a temp staging table and merged with a single
+    INSERT ... ON CONFLICT instead of one INSERT per row.
+    
+    Args:
+        engine: SQLAlchemy engine
+        rows: Tuples of (message_id, channel_name, image_path,
+            detection_count, image_category, confidence_score, has_person,
+            has_product, detected_objects, detections_json), one per message
+    
+    Returns:
+        Number of rows inserted or updated
+    """
+    # Strings are quoted so empty strings survive as ''; a missing
+    # confidence_score is written as "" and mapped back to NULL by FORCE_NULL
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    writer.writerows(rows)
+    buffer.seek(0)
+    
+    raw_conn = engine.raw_connection()
+    try:
+        cursor = raw_conn.cursor()
+        cursor.execute("""
+            CREATE TEMP TABLE yolo_staging (
+                message_id BIGINT,
+                channel_name VARCHAR(255),
+                image_path VARCHAR(500),
+                detection_count INTEGER,
+                image_category VARCHAR(50),
+                confidence_score NUMERIC(5, 3),
+                has_person BOOLEAN,
+                has_product BOOLEAN,
+                detected_objects TEXT,
+                detections_json TEXT
+            ) ON COMMIT DROP
+        """)
+        cursor.copy_expert(
+            "COPY yolo_staging FROM STDIN WITH (FORMAT csv, FORCE_NULL (confidence_score))",
+            buffer
+        )
+        cursor.execute("""
+            INSERT INTO raw.enriched_messages (
+                message_id,
+                channel_name,
+                image_path,
+                detection_count,
+                image_category,
+                confidence_score,
+                has_person,
+                has_product,
+                detected_objects,
+                detections_json
+            )
+            SELECT
+                message_id,
+                channel_name,
+                image_path,
+                detection_count,
+                image_category,
+                confidence_score,
+                has_person,
+                has_product,
+                detected_objects,
+                CAST(detections_json AS JSONB)
+            FROM yolo_staging
+            ON CONFLICT (message_id) DO UPDATE SET
+                detection_count = EXCLUDED.detection_count,
+                image_category = EXCLUDED.image_category,
+                confidence_score = EXCLUDED.confidence_score,
+                has_person = EXCLUDED.has_person,
+                has_product = EXCLUDED.has_product,
+                detected_objects = EXCLUDED.detected_objects,
+                detections_json = EXCLUDED.detections_json,
+                enriched_at = CURRENT_TIMESTAMP
+        """)
+        rows_loaded = cursor.rowcount
+        raw_conn.commit()
+        return rows_loaded
+    finally:
+        raw_conn.close()
+
+
+def load_yolo_detections(results: List[Dict], database_url: str) -> int:
+    """
+    Load in-memory YOLO detection results to PostgreSQL
+    
+    Used by the pipeline right after detection, so results go straight to
+    COPY without being written to and re-parsed from the CSV.
+    
+    Args:
+        results: Detection result dictionaries from YOLODetector
+        database_url: PostgreSQL connection URL
+    
+    Returns:
+        Number of rows inserted or updated
+    """
+    engine = create_engine(database_url)
+    create_enriched_table(engine)
+    
+    # Later results for the same message win, as with the CSV load
+    rows = {}
+    for result in results:
+        detected_objects = result.get('detected_objects', [])
+        if isinstance(detected_objects, list):
+            detected_objects = ','.join(detected_objects)
+        
+        rows[result['message_id']] = (
+            result['message_id'],
+            result['channel_name'],
+            result['image_path'],
+            result.get('detection_count', 0),
+            result.get('image_category', 'other'),
+            result.get('confidence_score'),
+            result.get('has_person', False),
+            result.get('has_product', False),
+            detected_objects,
+            result.get('detections_json') or '[]'
+        )
+    
+    try:
+        return copy_enriched_rows(engine, rows.values())
+    finally:
+        engine.dispose()
+
+
 def load_yolo_results(csv_path: Path, database_url: str):
     """
     Load YOLO detection results from CSV to PostgreSQL
@@ -65,77 +224,45 @@ def load_yolo_results(csv_path: Path, database_url: str):
     # Create table
     create_enriched_table(engine)
     
-    # Read CSV and insert data
-    rows_loaded = 0
+    # Parse and validate rows in Python, then bulk-load them with COPY
+    rows = {}
     rows_skipped = 0
     
     with open(csv_path, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         
-        with engine.connect() as conn:
-            for row in reader:
-                try:
-                    # Parse detected_objects (comma-separated string)
-                    detected_objects = row.get('detected_objects', '')
-                    
-                    # Insert or update
-                    # Cast JSON string to JSONB
-                    detections_json_value = row.get('detections_json', '[]')
-                    if not detections_json_value or detections_json_value == '':
-                        detections_json_value = '[]'
-                    
-                    conn.execute(text("""
-                        INSERT INTO raw.enriched_messages (
-                            message_id,
-                            channel_name,
-                            image_path,
-                            detection_count,
-                            image_category,
-                            confidence_score,
-                            has_person,
-                            has_product,
-                            detected_objects,
-                            detections_json
-                        ) VALUES (
-                            :message_id,
-                            :channel_name,
-                            :image_path,
-                            :detection_count,
-                            :image_category,
-                            :confidence_score,
-                            :has_person,
-                            :has_product,
-                            :detected_objects,
-                            CAST(:detections_json AS JSONB)
-                        )
-                        ON CONFLICT (message_id) DO UPDATE SET
-                            detection_count = EXCLUDED.detection_count,
-                            image_category = EXCLUDED.image_category,
-                            confidence_score = EXCLUDED.confidence_score,
-                            has_person = EXCLUDED.has_person,
-                            has_product = EXCLUDED.has_product,
-                            detected_objects = EXCLUDED.detected_objects,
-                            detections_json = EXCLUDED.detections_json,
-                            enriched_at = CURRENT_TIMESTAMP
-                    """), {
-                        'message_id': int(row['message_id']),
-                        'channel_name': row['channel_name'],
-                        'image_path': row['image_path'],
-                        'detection_count': int(row.get('detection_count', 0)),
-                        'image_category': row.get('image_category', 'other'),
-                        'confidence_score': float(row.get('confidence_score', 0.0)) if row.get('confidence_score') else None,
-                        'has_person': row.get('has_person', 'False').lower() == 'true',
-                        'has_product': row.get('has_product', 'False').lower() == 'true',
-                        'detected_objects': detected_objects,
-                        'detections_json': detections_json_value
-                    })
-                    rows_loaded += 1
-                except Exception as e:
-                    print(f"Error loading row for message_id {row.get('message_id')}: {e}")
-                    rows_skipped += 1
-                    continue
-            
-            conn.commit()
+        for row in reader:
+            try:
+                # Cast JSON string to JSONB; validated here so one bad row
+                # is skipped instead of failing the whole merge
+                detections_json_value = row.get('detections_json', '[]')
+                if not detections_json_value or detections_json_value == '':
+                    detections_json_value = '[]'
+                orjson.loads(detections_json_value)
+                
+                confidence_score = float(row.get('confidence_score', 0.0)) if row.get('confidence_score') else None
+                message_id = int(row['message_id'])
+                
+                # Later rows for the same message win, as with per-row upserts
+                rows[message_id] = (
+                    message_id,
+                    row['channel_name'],
+                    row['image_path'],
+                    int(row.get('detection_count', 0)),
+                    row.get('image_category', 'other'),
+                    confidence_score,
+                    row.get('has_person', 'False').lower() == 'true',
+                    row.get('has_product', 'False').lower() == 'true',
+                    row.get('detected_objects', ''),
+                    detections_json_value
+                )
+            except Exception as e:
+                print(f"Error loading row for message_id {row.get('message_id')}: {e}")
+                rows_skipped += 1
+                continue
+    
+    rows_loaded = copy_enriched_rows(engine, rows.values())
+    engine.dispose()
     
     print("\n" + "=" * 60)
     print(f"[SUCCESS] Load complete!")
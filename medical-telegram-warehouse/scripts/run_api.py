@@ -7,6 +7,22 @@ import os
 from pathlib import Path
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Run the FastAPI server")
+    parser.add_argument(
+        "--dev",
+        action="store_true",
+        help="Run a single auto-reloading worker for development"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("API_WORKERS", os.cpu_count() or 1)),
+        help="Number of worker processes (ignored with --dev). Defaults to API_WORKERS or CPU count."
+    )
+    args = parser.parse_args()
+    
     # Get project root
     project_root = Path(__file__).parent.parent
     
@@ -22,19 +38,26 @@ if __name__ == "__main__":
     print()
     print("Available Endpoints:")
     print("  - GET /api/reports/top-products?limit=10")
+    print("  - GET /api/channels")
     print("  - GET /api/channels/{channel_name}/activity")
     print("  - GET /api/search/messages?query=keyword&limit=20")
     print("  - GET /api/reports/visual-content")
+    print("  - GET /api/reports/product-types")
+    print("  - GET /api/reports/posting-trends?days=30")
     print()
     print("Press Ctrl+C to stop the server")
     print("=" * 70)
     print()
     
-    # Run the server
+    # Run the server. loop/http "auto" pick uvloop and httptools when
+    # installed (uvicorn[standard]) and fall back where they aren't (Windows)
     uvicorn.run(
         "api.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=args.dev,
+        workers=None if args.dev else args.workers,
+        loop="auto",
+        http="auto",
         log_level="info"
     )
@@ -23,6 +23,7 @@ if __name__ == "__main__":
     print("  2. load_raw_to_postgres - Load data to PostgreSQL")
     print("  3. run_dbt_transformations - Run dbt models")
     print("  4. run_yolo_enrichment - Run YOLO object detection")
+    print("  5. refresh_image_detection_models - Rebuild image detection models")
     print()
     print("Press Ctrl+C to stop the server")
     print("=" * 70)
@@ -2,14 +2,19 @@
 Script to run YOLO object detection on all scraped images
 Task 3 - Data Enrichment
 """
+import os
 import sys
 from pathlib import Path
+from dotenv import load_dotenv
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.enrichment.yolo_detector import YOLODetector
+from scripts.load_yolo_to_postgres import fetch_enriched_keys
+
+load_dotenv()
 
 if __name__ == "__main__":
     print("=" * 60)
@@ -32,9 +37,15 @@ if __name__ == "__main__":
     print("Loading YOLOv8 nano model...")
     detector = YOLODetector(model_path="yolov8n.pt", confidence_threshold=0.25)
     
+    # Skip images that are already in raw.enriched_messages
+    database_url = os.getenv("DATABASE_URL")
+    enriched = fetch_enriched_keys(database_url) if database_url else set()
+    if enriched:
+        print(f"{len(enriched)} images already enriched, skipping them")
+    
     # Process all images
     print("\nProcessing images...")
-    results = detector.scan_and_process_images(images_dir, output_csv)
+    results = detector.scan_and_process_images(images_dir, output_csv, skip=enriched)
     
     # Print summary
     print("\n" + "=" * 60)
@@ -12,6 +12,15 @@ sys.path.insert(0, str(project_root))
 
 from src.scraper.telegram_scraper import TelegramScraper
 
+
+async def scrape_and_close(scraper: TelegramScraper, channels, limit: int = 1000):
+    """Scrape channels and disconnect on the same event loop"""
+    try:
+        return await scraper.scrape_channels(channels, limit=limit)
+    finally:
+        await scraper.close()
+
+
 if __name__ == "__main__":
     # Default channels from requirements
     # CheMed, Lobelia Cosmetics, Tikvah Pharma
@@ -36,7 +45,7 @@ if __name__ == "__main__":
     scraper = TelegramScraper()
     
     try:
-        results = asyncio.run(scraper.scrape_channels(channels, limit=1000))
+        results = asyncio.run(scrape_and_close(scraper, channels, limit=1000))
         
         total = sum(len(msgs) for msgs in results.values())
         print(f"\n✓ Task 1 Complete!")
@@ -51,5 +60,3 @@ if __name__ == "__main__":
         print("\n\nScraping interrupted by user")
     except Exception as e:
         print(f"\n\nError: {e}")
-    finally:
-        asyncio.run(scraper.close())
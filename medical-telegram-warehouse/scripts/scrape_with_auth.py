@@ -11,6 +11,24 @@ sys.path.insert(0, str(project_root))
 
 from src.scraper.telegram_scraper import TelegramScraper
 
+
+async def authenticate_and_scrape(scraper: TelegramScraper, channels, phone: str):
+    """
+    Sign in and scrape on one event loop
+
+    The Telegram client is bound to the loop it connects on, so start,
+    scrape and disconnect all run inside a single asyncio.run() call.
+    """
+    try:
+        # Start the client (will prompt if needed)
+        await scraper.start(phone=phone if phone else None)
+        
+        # Now scrape
+        return await scraper.scrape_channels(channels, limit=100)
+    finally:
+        await scraper.close()
+
+
 if __name__ == "__main__":
     # Default channels
     channels = [
@@ -46,11 +64,7 @@ if __name__ == "__main__":
         else:
             print("No phone number in .env - you'll be prompted")
         
-        # Start the client (will prompt if needed)
-        asyncio.run(scraper.client.start(phone=phone if phone else None))
-        
-        # Now scrape
-        results = asyncio.run(scraper.scrape_channels(channels, limit=100))
+        results = asyncio.run(authenticate_and_scrape(scraper, channels, phone))
         
         total = sum(len(msgs) for msgs in results.values())
         print(f"\n[SUCCESS] Task 1 Complete!")
@@ -67,5 +81,3 @@ if __name__ == "__main__":
         print(f"\n\nError: {e}")
         import traceback
         traceback.print_exc()
-    finally:
-        asyncio.run(scraper.close())
@@ -1,10 +1,11 @@
 """
 YOLO Enricher for image object detection
 """
-import json
 import os
 from pathlib import Path
 from typing import Dict, List, Optional, Any
+import orjson
+from psycopg2.extras import execute_values
 from ultralytics import YOLO
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
@@ -12,6 +13,39 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Enriched rows sent to PostgreSQL per INSERT
+ENRICHMENT_BATCH_SIZE = 500
+
+# Messages with images that haven't been enriched. Newest first via the
+# partial index from PostgresLoader.create_raw_table, each probed against
+# the enriched_messages primary key
+_UNENRICHED_MESSAGES_SQL = text("""
+    SELECT 
+        rm.message_id,
+        rm.channel_name,
+        rm.message_date,
+        rm.image_path
+    FROM raw.telegram_messages rm
+    WHERE rm.has_media = TRUE 
+        AND rm.image_path IS NOT NULL
+        AND NOT EXISTS (
+            SELECT 1 FROM enriched_messages em WHERE em.message_id = rm.message_id
+        )
+    ORDER BY rm.message_date DESC
+    LIMIT :limit
+""")
+
+# Multi-row upsert for psycopg2.extras.execute_values
+_UPSERT_ENRICHED_SQL = """
+    INSERT INTO enriched_messages 
+    (message_id, channel_name, message_date, image_path, detected_objects, yolo_detections)
+    VALUES %s
+    ON CONFLICT (message_id) DO UPDATE SET
+        detected_objects = EXCLUDED.detected_objects,
+        yolo_detections = EXCLUDED.yolo_detections,
+        enriched_at = CURRENT_TIMESTAMP
+"""
+
 
 class YOLOEnricher:
     """Enrich messages with YOLO object detection"""
@@ -49,12 +83,16 @@ class YOLOEnricher:
             detections = []
             
             for result in results:
-                for box in result.boxes:
+                # One device-to-host copy per result rather than per box
+                boxes = result.boxes.cpu().numpy()
+                for cls, confidence, bbox in zip(
+                    boxes.cls.tolist(), boxes.conf.tolist(), boxes.xyxy.tolist()
+                ):
                     detections.append({
-                        "class": result.names[int(box.cls)],
-                        "class_id": int(box.cls),
-                        "confidence": float(box.conf.item()),
-                        "bbox": box.xyxy[0].tolist()  # [x1, y1, x2, y2]
+                        "class": result.names[int(cls)],
+                        "class_id": int(cls),
+                        "confidence": confidence,
+                        "bbox": bbox  # [x1, y1, x2, y2]
                     })
             
             return detections
@@ -96,29 +134,28 @@ class YOLOEnricher:
         if not self.database_url:
             raise ValueError("Database URL required for database enrichment")
         
-        with self.Session() as session:
-            # Get messages with images that haven't been enriched
-            query = text("""
-                SELECT 
-                    rm.message_id,
-                    rm.channel_name,
-                    rm.message_date,
-                    rm.image_path
-                FROM raw_messages rm
-                LEFT JOIN enriched_messages em ON rm.message_id = em.message_id
-                WHERE rm.has_media = TRUE 
-                    AND rm.image_path IS NOT NULL
-                    AND em.message_id IS NULL
-                ORDER BY rm.message_date DESC
-                LIMIT :limit
-            """)
+        remaining = limit or 1000
+        enriched_count = 0
+        
+        # Work through the backlog a batch at a time. Saved messages drop out
+        # of the "not yet enriched" query, so each fetch returns the next
+        # batch; memory stays bounded and no transaction is held open
+        # during inference
+        while remaining > 0:
+            with self.Session() as session:
+                # Get messages with images that haven't been enriched
+                result = session.execute(
+                    _UNENRICHED_MESSAGES_SQL,
+                    {"limit": min(remaining, ENRICHMENT_BATCH_SIZE)}
+                )
+                messages = result.fetchall()
             
-            result = session.execute(query, {"limit": limit or 1000})
-            messages = result.fetchall()
+            if not messages:
+                break
             
             print(f"Found {len(messages)} messages to enrich")
             
-            enriched_count = 0
+            rows = []
             for msg in messages:
                 message_dict = {
                     "message_id": msg[0],
@@ -128,37 +165,56 @@ class YOLOEnricher:
                 }
                 
                 enriched = self.enrich_message(message_dict)
-                
-                # Save to enriched_messages table
-                try:
-                    session.execute(
-                        text("""
-                            INSERT INTO enriched_messages 
-                            (message_id, channel_name, message_date, image_path, detected_objects, yolo_detections)
-                            VALUES (:message_id, :channel_name, :message_date, :image_path, 
-                                    :detected_objects::jsonb, :yolo_detections::jsonb)
-                            ON CONFLICT (message_id) DO UPDATE SET
-                                detected_objects = EXCLUDED.detected_objects,
-                                yolo_detections = EXCLUDED.yolo_detections,
-                                enriched_at = CURRENT_TIMESTAMP
-                        """),
-                        {
-                            "message_id": enriched["message_id"],
-                            "channel_name": enriched["channel_name"],
-                            "message_date": enriched["message_date"],
-                            "image_path": enriched["image_path"],
-                            "detected_objects": json.dumps(enriched["detected_objects"]),
-                            "yolo_detections": json.dumps(enriched["yolo_detections"])
-                        }
-                    )
-                    enriched_count += 1
-                except Exception as e:
-                    print(f"Error saving enrichment for message {enriched['message_id']}: {e}")
-                    session.rollback()
-                    continue
+                rows.append((
+                    enriched["message_id"],
+                    enriched["channel_name"],
+                    enriched["message_date"],
+                    enriched["image_path"],
+                    orjson.dumps(enriched["detected_objects"]).decode(),
+                    orjson.dumps(enriched["yolo_detections"]).decode()
+                ))
             
-            session.commit()
-            print(f"Enriched {enriched_count} messages")
+            saved = self._save_enrichments(rows)
+            if not saved:
+                # The same messages would come back on the next fetch
+                break
+            enriched_count += saved
+            remaining -= len(messages)
+        
+        print(f"Enriched {enriched_count} messages")
+    
+    def _save_enrichments(self, rows: List[tuple]) -> int:
+        """
+        Upsert a batch of enrichment rows into enriched_messages
+        
+        The whole batch goes to the server in one multi-row INSERT instead
+        of one statement per message.
+        
+        Args:
+            rows: Tuples of (message_id, channel_name, message_date,
+                image_path, detected_objects JSON, yolo_detections JSON)
+            
+        Returns:
+            Number of rows saved (0 if the batch failed)
+        """
+        raw_conn = self.engine.raw_connection()
+        try:
+            cursor = raw_conn.cursor()
+            execute_values(
+                cursor,
+                _UPSERT_ENRICHED_SQL,
+                rows,
+                template="(%s, %s, %s, %s, %s::jsonb, %s::jsonb)",
+                page_size=len(rows)
+            )
+            raw_conn.commit()
+            return len(rows)
+        except Exception as e:
+            raw_conn.rollback()
+            print(f"Error saving enrichments for {len(rows)} messages: {e}")
+            return 0
+        finally:
+            raw_conn.close()
     
     def get_detection_summary(self) -> Dict[str, Any]:
         """Get summary of detected objects"""
@@ -1,17 +1,61 @@
 """
 PostgreSQL Loader for raw messages
 """
-import json
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from sqlalchemy import create_engine, text, inspect
-from sqlalchemy.orm import sessionmaker, Session
-import pandas as pd
+from typing import List, Any, Iterable, Optional, Tuple
+import orjson
+from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Column order of rows produced by parse_message_file and fed to COPY
+RAW_MESSAGE_COLUMNS = (
+    "message_id",
+    "channel_name",
+    "channel_title",
+    "message_date",
+    "message_text",
+    "has_media",
+    "image_path",
+    "views",
+    "forwards",
+)
+
+
+def parse_message_file(json_path: Path) -> List[Tuple]:
+    """
+    Parse a scraped JSON file into rows ready for COPY
+    
+    Module-level so it can run in worker processes.
+    
+    Args:
+        json_path: Path to JSON file
+        
+    Returns:
+        List of tuples in RAW_MESSAGE_COLUMNS order
+    """
+    with open(json_path, 'rb') as f:
+        messages = orjson.loads(f.read())
+    
+    return [tuple(msg.get(col) for col in RAW_MESSAGE_COLUMNS) for msg in messages or []]
+
+
+def _copy_text_value(value: Any) -> str:
+    """Format a value for COPY ... FROM STDIN in text format"""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
 
 class PostgresLoader:
     """Loader for inserting data into PostgreSQL"""
@@ -22,7 +66,6 @@ class PostgresLoader:
             raise ValueError("DATABASE_URL must be set in .env or passed as parameter")
         
         self.engine = create_engine(self.database_url)
-        self.Session = sessionmaker(bind=self.engine)
     
     def create_raw_schema(self):
         """Create raw schema if it doesn't exist"""
@@ -49,6 +92,12 @@ class PostgresLoader:
                     loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """))
+            # Messages with images, newest first, for YOLOEnricher's backlog query
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS telegram_messages_images_by_date
+                ON raw.telegram_messages (message_date DESC)
+                WHERE has_media AND image_path IS NOT NULL
+            """))
             conn.commit()
             print("Raw.telegram_messages table created/verified")
     
@@ -64,7 +113,7 @@ class PostgresLoader:
                     detected_objects JSONB,
                     yolo_detections JSONB,
                     enriched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (message_id) REFERENCES raw_messages(message_id)
+                    FOREIGN KEY (message_id) REFERENCES raw.telegram_messages(message_id)
                 )
             """))
             conn.commit()
@@ -82,88 +131,128 @@ class PostgresLoader:
             print(f"JSON file not found: {json_path}")
             return
         
-        with open(json_path, 'r', encoding='utf-8') as f:
-            messages = json.load(f)
+        rows = parse_message_file(json_path)
         
-        if not messages:
+        if not rows:
             print(f"No messages to load from {json_path}")
             return
         
-        df = pd.DataFrame(messages)
+        # COPY into a staging table and merge, skipping existing message IDs
+        inserted = self.copy_messages([rows], table_name)
+        print(f"Loaded {inserted} new messages from {json_path.name} to {table_name}")
+    
+    def copy_messages(
+        self,
+        row_batches: Iterable[List[Tuple]],
+        table_name: str = "raw.telegram_messages"
+    ) -> int:
+        """
+        Bulk-load message rows with COPY, skipping existing message IDs
+        
+        Batches are streamed into a temp staging table as they arrive and
+        merged into the target table in one statement. The commit does not
+        wait for the WAL flush: a crash can only lose the latest load, and
+        the JSON files it came from are still in the data lake.
+        
+        Args:
+            row_batches: Iterable of row lists in RAW_MESSAGE_COLUMNS order
+            table_name: Target table name
+            
+        Returns:
+            Number of new messages inserted
+        """
+        columns = ", ".join(RAW_MESSAGE_COLUMNS)
+        raw_conn = self.engine.raw_connection()
+        try:
+            cursor = raw_conn.cursor()
+            cursor.execute("SET LOCAL synchronous_commit = off")
+            cursor.execute(f"""
+                CREATE TEMP TABLE message_staging
+                (LIKE {table_name} INCLUDING DEFAULTS)
+                ON COMMIT DROP
+            """)
+            for rows in row_batches:
+                buffer = io.StringIO()
+                for row in rows:
+                    buffer.write("\t".join(_copy_text_value(v) for v in row))
+                    buffer.write("\n")
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY message_staging ({columns}) FROM STDIN", buffer)
+            
+            cursor.execute(f"""
+                INSERT INTO {table_name} ({columns})
+                SELECT DISTINCT ON (message_id) {columns}
+                FROM message_staging
+                ORDER BY message_id
+                ON CONFLICT (message_id) DO NOTHING
+            """)
+            inserted = cursor.rowcount
+            
+            # Refresh planner stats for the dbt run that follows the load
+            if inserted:
+                cursor.execute(f"ANALYZE {table_name}")
+            raw_conn.commit()
+            return inserted
+        finally:
+            raw_conn.close()
+    
+    def load_from_directories(
+        self,
+        directories: List[Path],
+        pattern: str = "*.json",
+        workers: Optional[int] = None
+    ) -> int:
+        """
+        Load all JSON files from several directories
         
-        # Convert message_date to datetime
-        if 'message_date' in df.columns:
-            df['message_date'] = pd.to_datetime(df['message_date'], errors='coerce')
+        Files are parsed in parallel worker processes and their rows are
+        streamed into a single COPY as each file finishes.
         
-        # Ensure boolean columns are properly typed
-        if 'has_media' in df.columns:
-            df['has_media'] = df['has_media'].astype(bool)
+        Args:
+            directories: Directories containing JSON files
+            pattern: File pattern to match
+            workers: Number of parser processes (defaults to CPU count)
+            
+        Returns:
+            Number of new messages inserted
+        """
+        json_files = []
+        for directory in directories:
+            files = [f for f in directory.glob(pattern) if not f.name.startswith("_")]  # Skip manifest files
+            print(f"Found {len(files)} JSON files in {directory}")
+            json_files.extend(files)
         
-        # Load to database (append mode, ignore duplicates)
-        # Handle schema-qualified table names
-        if '.' in table_name:
-            schema, table = table_name.split('.', 1)
-        else:
-            schema, table = None, table_name
+        if not json_files:
+            return 0
         
-        try:
-            df.to_sql(
-                table,
-                self.engine,
-                schema=schema,
-                if_exists='append',
-                index=False,
-                method='multi'
-            )
-            print(f"Loaded {len(df)} messages from {json_path.name} to {table_name}")
-        except Exception as e:
-            print(f"Error loading data: {e}")
-            # Try inserting one by one to handle duplicates
-            self._load_messages_one_by_one(messages, table_name)
-    
-    def _load_messages_one_by_one(self, messages: List[Dict], table_name: str):
-        """Load messages one by one, skipping duplicates"""
-        with self.Session() as session:
-            for msg in messages:
-                try:
-                    # Check if message_id already exists
-                    exists = session.execute(
-                        text(f"SELECT 1 FROM {table_name} WHERE message_id = :msg_id"),
-                        {"msg_id": msg["message_id"]}
-                    ).fetchone()
-                    
-                    if not exists:
-                        # Insert new message
-                        df = pd.DataFrame([msg])
-                        if 'message_date' in df.columns:
-                            df['message_date'] = pd.to_datetime(df['message_date'], errors='coerce')
-                        df.to_sql(
-                            table_name,
-                            self.engine,
-                            if_exists='append',
-                            index=False
-                        )
-                except Exception as e:
-                    print(f"Error inserting message {msg.get('message_id')}: {e}")
-                    continue
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(parse_message_file, f): f for f in json_files}
             
-            session.commit()
+            def parsed_batches():
+                for future in as_completed(futures):
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        print(f"Error parsing {futures[future].name}: {e}")
+            
+            inserted = self.copy_messages(parsed_batches())
+        
+        print(f"Loaded {inserted} new messages from {len(json_files)} files")
+        return inserted
     
-    def load_from_directory(self, directory: Path, pattern: str = "*.json"):
+    def load_from_directory(self, directory: Path, pattern: str = "*.json", workers: Optional[int] = None) -> int:
         """
         Load all JSON files from a directory
         
         Args:
             directory: Directory containing JSON files
             pattern: File pattern to match
+            workers: Number of parser processes (defaults to CPU count)
+            
+        Returns:
+            Number of new messages inserted
         """
-        json_files = list(directory.glob(pattern))
-        print(f"Found {len(json_files)} JSON files in {directory}")
-        
-        for json_file in json_files:
-            if json_file.name.startswith("_"):  # Skip manifest files
-                continue
-            self.load_from_json(json_file)
+        return self.load_from_directories([directory], pattern=pattern, workers=workers)
     
     def get_table_count(self, table_name: str = "raw.telegram_messages") -> int:
         """Get row count from a table"""
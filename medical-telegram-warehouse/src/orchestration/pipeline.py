@@ -7,6 +7,7 @@ This pipeline orchestrates the entire data pipeline:
 2. Load raw data to PostgreSQL
 3. Run dbt transformations
 4. Run YOLO enrichment
+5. Rebuild the image detection models from the new detections
 """
 import asyncio
 import os
@@ -14,7 +15,7 @@ import subprocess
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from dagster import (
     op,
@@ -34,9 +35,11 @@ from dagster import (
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.scraper.telegram_scraper import TelegramScraper
 from src.loader.postgres_loader import PostgresLoader
-from src.enrichment.yolo_detector import YOLODetector
+
+# The scraper (Telethon) and detector (ultralytics/torch) are imported inside
+# their ops: Dagster reloads this module on every code-location load, and
+# torch alone adds seconds to that
 
 
 class PipelineConfig(Config):
@@ -47,17 +50,45 @@ class PipelineConfig(Config):
     yolo_confidence: float = 0.25
 
 
+def _count_jpgs(directory: str) -> int:
+    """Count .jpg files in a directory without building a list of paths"""
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return 0
+    with entries:
+        return sum(
+            1 for entry in entries
+            if entry.name.endswith(".jpg") and entry.is_file(follow_symlinks=False)
+        )
+
+
+def _latest_date_dir(directory: Path) -> Optional[Path]:
+    """Return the newest YYYY-MM-DD subdirectory, or None if there is none"""
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return None
+    with entries:
+        # ISO dates sort lexicographically, so the max name is the latest day
+        latest = max(
+            (entry for entry in entries if entry.is_dir()),
+            key=lambda entry: entry.name,
+            default=None
+        )
+    return Path(latest.path) if latest is not None else None
+
+
 @op(
     description="Scrape Telegram channels and save data to the data lake"
 )
-def scrape_telegram_data(context: OpExecutionContext) -> Dict[str, Any]:
+def scrape_telegram_data(context: OpExecutionContext, config: PipelineConfig) -> Dict[str, Any]:
     """
     Operation: Scrape Telegram channels
     
     Scrapes messages and images from Telegram channels and saves them
     to the raw data lake (JSON files and images).
     """
-    config = PipelineConfig()
     channels_str = config.channels
     limit = config.scrape_limit
     base_path = config.base_path
@@ -67,23 +98,33 @@ def scrape_telegram_data(context: OpExecutionContext) -> Dict[str, Any]:
     context.log.info(f"Starting Telegram scrape for {len(channels)} channels")
     context.log.info(f"Channels: {', '.join(channels)}")
     
-    scraper = TelegramScraper(base_path=base_path)
+    from src.scraper.telegram_scraper import scrape_all_channels
     
+    # Scrape on uvloop where it is installed (it comes with uvicorn[standard]
+    # but does not build on Windows); the policy is left alone so other
+    # event loops in the process are unaffected
     try:
-        results = asyncio.run(scraper.scrape_channels(channels, limit=limit))
+        import uvloop
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
+    
+    try:
+        # Scrapes and disconnects on one event loop
+        results = run(scrape_all_channels(channels, base_path=base_path, limit=limit))
         
-        total_messages = sum(len(msgs) for msgs in results.values())
+        messages_per_channel = {ch: len(msgs) for ch, msgs in results.items()}
+        total_messages = sum(messages_per_channel.values())
         total_images = sum(
-            len([f for f in (Path(base_path) / "raw" / "images" / ch).glob("*.jpg")])
-            for ch in results.keys()
-            if (Path(base_path) / "raw" / "images" / ch).exists()
+            _count_jpgs(os.path.join(base_path, "raw", "images", ch))
+            for ch in results
         )
         
         stats = {
             "channels_scraped": len(results),
             "total_messages": total_messages,
             "total_images": total_images,
-            "messages_per_channel": {ch: len(msgs) for ch, msgs in results.items()},
+            "messages_per_channel": messages_per_channel,
             "timestamp": datetime.now().isoformat(),
             "status": "success"
         }
@@ -95,20 +136,19 @@ def scrape_telegram_data(context: OpExecutionContext) -> Dict[str, Any]:
     except Exception as e:
         context.log.error(f"Error during scraping: {e}")
         raise
-    finally:
-        asyncio.run(scraper.close())
 
 
 @op(
     description="Load raw JSON data from data lake to PostgreSQL"
 )
-def load_raw_to_postgres(context: OpExecutionContext, scrape_result: Dict[str, Any]) -> Dict[str, Any]:
+def load_raw_to_postgres(
+    context: OpExecutionContext, config: PipelineConfig, scrape_result: Dict[str, Any]
+) -> Dict[str, Any]:
     """
     Operation: Load raw data to PostgreSQL
     
     Loads JSON files from the data lake into the raw.telegram_messages table.
     """
-    config = PipelineConfig()
     base_path = config.base_path
     today = datetime.now().strftime("%Y-%m-%d")
     
@@ -119,15 +159,14 @@ def load_raw_to_postgres(context: OpExecutionContext, scrape_result: Dict[str, A
     try:
         loader.create_raw_table()
         
-        json_dir = Path(base_path) / "raw" / "telegram_messages" / today
+        base_json_dir = Path(base_path) / "raw" / "telegram_messages"
+        json_dir = base_json_dir / today
         if not json_dir.exists():
             # Try to find any available date directory
-            base_json_dir = Path(base_path) / "raw" / "telegram_messages"
-            if base_json_dir.exists():
-                date_dirs = sorted([d for d in base_json_dir.iterdir() if d.is_dir()], reverse=True)
-                if date_dirs:
-                    json_dir = date_dirs[0]
-                    context.log.info(f"Using data from: {json_dir.name}")
+            latest = _latest_date_dir(base_json_dir)
+            if latest is not None:
+                json_dir = latest
+                context.log.info(f"Using data from: {json_dir.name}")
         
         if json_dir.exists():
             loader.load_from_directory(json_dir)
@@ -178,14 +217,11 @@ def run_dbt_transformations(context: OpExecutionContext, load_result: Dict[str,
         }
     
     try:
-        # Change to dbt project directory
-        original_cwd = os.getcwd()
-        os.chdir(dbt_project_dir)
-        
         # Run dbt deps first (if needed)
         try:
             deps_result = subprocess.run(
                 ["dbt", "deps"],
+                cwd=dbt_project_dir,
                 capture_output=True,
                 text=True,
                 timeout=300
@@ -195,16 +231,29 @@ def run_dbt_transformations(context: OpExecutionContext, load_result: Dict[str,
         except Exception as e:
             context.log.warning(f"dbt deps skipped: {e}")
         
+        # Load seed lookup tables (stopwords, image categories) before the
+        # models that join them
+        seed_result = subprocess.run(
+            ["dbt", "seed"],
+            cwd=dbt_project_dir,
+            capture_output=True,
+            text=True,
+            timeout=300
+        )
+        if seed_result.returncode != 0:
+            error_msg = seed_result.stderr or seed_result.stdout
+            context.log.error(f"✗ dbt seed failed: {error_msg[-500:]}")
+            raise Exception(f"dbt seed failed: {error_msg[-500:]}")
+        
         # Run dbt models
         result = subprocess.run(
             ["dbt", "run"],
+            cwd=dbt_project_dir,
             capture_output=True,
             text=True,
             timeout=600
         )
         
-        os.chdir(original_cwd)
-        
         if result.returncode == 0:
             context.log.info("✓ dbt transformations completed successfully")
             # Log summary
@@ -213,6 +262,14 @@ def run_dbt_transformations(context: OpExecutionContext, load_result: Dict[str,
             if summary_lines:
                 context.log.info("\n".join(summary_lines[-10:]))  # Last 10 relevant lines
             
+            # Cached API responses are stale once the marts are rebuilt
+            try:
+                from api.cache import bump_warehouse_version
+                bump_warehouse_version(context.run_id)
+                context.log.info(f"✓ API cache moved to warehouse version {context.run_id}")
+            except Exception as e:
+                context.log.warning(f"API cache invalidation skipped: {e}")
+            
             return {
                 "status": "success",
                 "timestamp": datetime.now().isoformat()
@@ -235,22 +292,20 @@ def run_dbt_transformations(context: OpExecutionContext, load_result: Dict[str,
     except Exception as e:
         context.log.error(f"Error running dbt: {e}")
         raise
-    finally:
-        if 'original_cwd' in locals():
-            os.chdir(original_cwd)
 
 
 @op(
     description="Run YOLO object detection on images"
 )
-def run_yolo_enrichment(context: OpExecutionContext, dbt_result: Dict[str, Any]) -> Dict[str, Any]:
+def run_yolo_enrichment(
+    context: OpExecutionContext, config: PipelineConfig, dbt_result: Dict[str, Any]
+) -> Dict[str, Any]:
     """
     Operation: Run YOLO enrichment
     
     Processes images with YOLO object detection and saves results to CSV,
     then loads to PostgreSQL.
     """
-    config = PipelineConfig()
     base_path = config.base_path
     confidence = config.yolo_confidence
     
@@ -272,20 +327,25 @@ def run_yolo_enrichment(context: OpExecutionContext, dbt_result: Dict[str, Any])
         output_csv.parent.mkdir(parents=True, exist_ok=True)
         
         # Initialize detector
+        from src.enrichment.yolo_detector import YOLODetector
         detector = YOLODetector(model_path="yolov8n.pt", confidence_threshold=confidence)
         
-        # Process images
-        results = detector.scan_and_process_images(images_dir, output_csv)
-        
-        # Load to PostgreSQL
-        from scripts.load_yolo_to_postgres import load_yolo_results
+        from scripts.load_yolo_to_postgres import fetch_enriched_keys, load_yolo_detections
         from dotenv import load_dotenv
         load_dotenv()
         
+        # Images already in raw.enriched_messages are not detected again
         database_url = os.getenv("DATABASE_URL")
+        enriched = fetch_enriched_keys(database_url) if database_url else set()
+        
+        # Process images
+        results = detector.scan_and_process_images(images_dir, output_csv, skip=enriched)
+        
+        # Load to PostgreSQL straight from memory; the CSV stays on disk as
+        # an artifact for load_yolo_to_postgres.py
         if database_url:
-            load_yolo_results(output_csv, database_url)
-            context.log.info(f"✓ Loaded YOLO results to PostgreSQL")
+            loaded = load_yolo_detections(results, database_url)
+            context.log.info(f"✓ Loaded {loaded} YOLO results to PostgreSQL")
         else:
             context.log.warning("DATABASE_URL not set, skipping database load")
         
@@ -311,8 +371,66 @@ def run_yolo_enrichment(context: OpExecutionContext, dbt_result: Dict[str, Any])
         raise
 
 
+@op(
+    description="Rebuild image detection models after YOLO enrichment"
+)
+def refresh_image_detection_models(context: OpExecutionContext, enrichment_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Operation: Refresh image detection models
+    
+    YOLO enrichment runs after the main dbt run, so fct_image_detections and
+    the views built on it (image category stats, detected object
+    combinations, visual content payload) are rebuilt here from the new
+    detections.
+    """
+    if enrichment_result.get("status") != "success":
+        context.log.info("No new detections, skipping image model refresh")
+        return {
+            "status": "skipped",
+            "reason": "YOLO enrichment did not run",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    dbt_project_dir = project_root / "medical_warehouse"
+    
+    try:
+        result = subprocess.run(
+            ["dbt", "run", "--select", "fct_image_detections+"],
+            cwd=dbt_project_dir,
+            capture_output=True,
+            text=True,
+            timeout=600
+        )
+    except FileNotFoundError:
+        context.log.warning("dbt command not found. Install dbt-postgres to run transformations.")
+        return {
+            "status": "skipped",
+            "reason": "dbt not installed",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    if result.returncode != 0:
+        error_msg = result.stderr or result.stdout
+        context.log.error(f"✗ dbt run failed: {error_msg[-500:]}")
+        raise Exception(f"dbt run failed: {error_msg[-500:]}")
+    
+    context.log.info("✓ Image detection models rebuilt")
+    
+    try:
+        from api.cache import bump_warehouse_version
+        bump_warehouse_version(f"{context.run_id}-enriched")
+        context.log.info("✓ API cache moved to the enriched warehouse version")
+    except Exception as e:
+        context.log.warning(f"API cache invalidation skipped: {e}")
+    
+    return {
+        "status": "success",
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @job(
-    description="Complete data pipeline: Scrape → Load → Transform → Enrich"
+    description="Complete data pipeline: Scrape → Load → Transform → Enrich → Refresh"
 )
 def medical_telegram_pipeline():
     """
@@ -321,11 +439,13 @@ def medical_telegram_pipeline():
     2. Load to PostgreSQL
     3. Run dbt transformations
     4. Run YOLO enrichment
+    5. Rebuild image detection models
     """
     scrape_result = scrape_telegram_data()
     load_result = load_raw_to_postgres(scrape_result)
     dbt_result = run_dbt_transformations(load_result)
-    run_yolo_enrichment(dbt_result)
+    enrichment_result = run_yolo_enrichment(dbt_result)
+    refresh_image_detection_models(enrichment_result)
 
 
 @schedule(
@@ -11,7 +11,7 @@ sys.path.insert(0, str(project_root))
 
 # Import and run the scraper
 if __name__ == "__main__":
-    from src.scraper.telegram_scraper import TelegramScraper
+    from src.scraper.telegram_scraper import scrape_all_channels
     import asyncio
     import argparse
     
@@ -43,12 +43,7 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
     
-    scraper = TelegramScraper(base_path=args.base_path)
-    
-    try:
-        results = asyncio.run(
-            scraper.scrape_channels(channels=args.channels, limit=args.limit)
-        )
-        print(f"\n✓ Task 1 Complete: Scraped {sum(len(msgs) for msgs in results.values())} messages")
-    finally:
-        asyncio.run(scraper.close())
+    results = asyncio.run(
+        scrape_all_channels(args.channels, base_path=args.base_path, limit=args.limit)
+    )
+    print(f"\n✓ Task 1 Complete: Scraped {sum(len(msgs) for msgs in results.values())} messages")
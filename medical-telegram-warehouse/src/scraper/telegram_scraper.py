@@ -15,12 +15,13 @@ Usage:
 """
 import asyncio
 import os
-import json
 import logging
+import random
 import sys
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
+import orjson
 from telethon import TelegramClient
 from telethon.errors import FloodWaitError, ChannelPrivateError
 from telethon.tl.types import MessageMediaPhoto
@@ -28,8 +29,24 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-# Date string for partitioning output files
-TODAY = datetime.now().strftime("%Y-%m-%d")
+# FloodWaitErrors longer than this defer the rest of the channel to the next
+# run instead of holding a scrape slot; shorter ones are waited out and the
+# channel resumes, at most FLOOD_WAIT_MAX_RETRIES times
+FLOOD_WAIT_MAX_SECONDS = 300
+FLOOD_WAIT_MAX_RETRIES = 3
+FLOOD_WAIT_JITTER_SECONDS = 5
+
+
+def _write_json(path: Path, data: Any):
+    """
+    Serialize data with orjson and write it to path
+
+    The bytes go to a temporary file that is then renamed over path, so a
+    crash mid-write never leaves a truncated file for the loader to read.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(orjson.dumps(data))
+    os.replace(tmp_path, path)
 
 
 class TelegramScraper:
@@ -48,6 +65,10 @@ class TelegramScraper:
             session_name = f"telegram_scraper_{self.phone.replace('+', '').replace('-', '')}"
         
         self.client = TelegramClient(session_name, self.api_id, self.api_hash)
+        # client.start() re-checks authorization with a get_me() round-trip
+        # even when already connected, so it is only called once per run
+        self._started = False
+        self._start_lock = asyncio.Lock()
         
         if not self.api_id or not self.api_hash:
             raise ValueError("TELEGRAM_API_ID and TELEGRAM_API_HASH must be set in .env")
@@ -60,6 +81,7 @@ class TelegramScraper:
             "channels_scraped": [],
             "total_messages": 0,
             "total_images": 0,
+            "images_skipped": 0,
             "errors": []
         }
     
@@ -71,11 +93,13 @@ class TelegramScraper:
         self.logger = logging.getLogger("telegram_scraper")
         self.logger.setLevel(logging.INFO)
         
-        # Remove existing handlers to avoid duplicates
+        # Remove existing handlers to avoid duplicates; records are not
+        # passed on to root handlers, which would print them a second time
         self.logger.handlers = []
+        self.logger.propagate = False
         
         # File handler - logs everything to file
-        log_file = log_dir / f"scrape_{TODAY}.log"
+        log_file = log_dir / f"scrape_{datetime.now().strftime('%Y-%m-%d')}.log"
         file_handler = logging.FileHandler(log_file, encoding="utf-8")
         file_handler.setFormatter(
             logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
@@ -96,15 +120,27 @@ class TelegramScraper:
         self, 
         channel: str, 
         limit: int = 1000,
-        message_delay: float = 1.0
+        message_delay: float = 0.0,
+        download_concurrency: int = 5,
+        today: Optional[str] = None,
+        incremental: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Scrape messages from a Telegram channel
         
+        Images are downloaded in background tasks while iteration moves on
+        to the next messages; the JSON file is written once they finish.
+        
         Args:
             channel: Channel username (e.g., '@cheMed123' or 'https://t.me/lobelia4cosmetics')
             limit: Maximum number of messages to scrape
-            message_delay: Delay between messages in seconds
+            message_delay: Optional delay between messages in seconds;
+                Telethon already waits out short flood waits itself
+            download_concurrency: Maximum number of image downloads in flight
+            today: YYYY-MM-DD partition for the JSON file (defaults to the
+                current local date)
+            incremental: Only fetch messages newer than those saved in
+                earlier date partitions; otherwise fetch the newest `limit`
             
         Returns:
             List of message dictionaries
@@ -117,13 +153,17 @@ class TelegramScraper:
             channel = "@" + channel
         
         channel_name = channel.strip("@")
-        today = datetime.now().strftime("%Y-%m-%d")
+        today = today or datetime.now().strftime("%Y-%m-%d")
         
         self.logger.info(f"Starting scrape of {channel} (limit={limit})")
         
         try:
-            await self.client.start()
-            entity = await self.client.get_entity(channel)
+            await self.start()
+            # get_input_entity checks the usernames Telethon has stored in the
+            # session file before calling ResolveUsername, the RPC Telegram
+            # rate-limits hardest; fetching by the resolved peer is cheap
+            input_entity = await self.client.get_input_entity(channel)
+            entity = await self.client.get_entity(input_entity)
             channel_title = entity.title if hasattr(entity, 'title') else channel_name
             
             self.logger.info(f"Channel found: {channel_title} ({channel_name})")
@@ -141,94 +181,156 @@ class TelegramScraper:
         
         messages = []
         images_downloaded = 0
+        images_skipped = 0
+        download_semaphore = asyncio.Semaphore(max(1, download_concurrency))
+        # (message dict, download task) for every image still being fetched
+        pending_downloads = []
         
         # Create image directory: data/raw/images/{channel_name}/
         image_dir = self.base_path / "raw" / "images" / channel_name
         image_dir.mkdir(parents=True, exist_ok=True)
         self.logger.info(f"Image directory: {image_dir}")
         
+        # Images from earlier runs; downloads land under a .part name and are
+        # renamed when complete, so every .jpg listed here is a whole file
+        existing_images = {
+            entry.name for entry in os.scandir(image_dir)
+            if entry.name.endswith(".jpg")
+        }
+        
         # Create JSON directory: data/raw/telegram_messages/YYYY-MM-DD/
         json_dir = self.base_path / "raw" / "telegram_messages" / today
         json_dir.mkdir(parents=True, exist_ok=True)
         self.logger.info(f"JSON directory: {json_dir}")
         
+        # Telegram filters out messages at or below min_id server-side
+        min_id = 0
+        if incremental:
+            min_id = await asyncio.to_thread(self._last_scraped_id, channel_name, today)
+            if min_id:
+                self.logger.info(f"Fetching {channel_name} messages newer than {min_id}")
+        
+        flood_waits = 0
+        # Exclusive lower bound of the messages this run covers
+        lower_id = min_id or None
         try:
             message_count = 0
-            async for message in self.client.iter_messages(entity, limit=limit):
-                message_count += 1
-                image_path = None
-                has_media = message.media is not None
+            while True:
+                # Every run goes oldest-first from lower_id, so a scrape cut
+                # short still ends at a point the next run can continue from;
+                # after a flood wait, iteration resumes past the last message
+                resume_id = messages[-1]["message_id"] if messages else None
                 
-                # Download image if present
-                # Store as: data/raw/images/{channel_name}/{message_id}.jpg
-                if has_media and isinstance(message.media, MessageMediaPhoto):
-                    filename = f"{message.id}.jpg"
-                    image_path = str(image_dir / filename)
-                    try:
-                        await self.client.download_media(message.media, image_path)
-                        images_downloaded += 1
-                        self.logger.debug(f"Downloaded image: {image_path}")
-                    except Exception as e:
-                        error_msg = f"Failed to download image for message {message.id}: {e}"
-                        self.logger.warning(error_msg)
+                try:
+                    if lower_id is None:
+                        # First runs and --full take the newest `limit` messages:
+                        # start just below the limit-th newest one
+                        window = await self.client.get_messages(
+                            entity, limit=1, add_offset=limit - 1
+                        )
+                        lower_id = window[0].id - 1 if window else 0
+                    
+                    async for message in self.client.iter_messages(
+                        entity,
+                        limit=limit - len(messages),
+                        min_id=resume_id or lower_id,
+                        reverse=True
+                    ):
+                        message_count += 1
                         image_path = None
+                        has_media = message.media is not None
+                        
+                        # Image path if present; the download runs in the background
+                        # Store as: data/raw/images/{channel_name}/{message_id}.jpg
+                        if has_media and isinstance(message.media, MessageMediaPhoto):
+                            filename = f"{message.id}.jpg"
+                            image_path = str(image_dir / filename)
+                        
+                        # Build message dictionary with all required fields
+                        msg_dict = {
+                            "message_id": message.id,
+                            "channel_name": channel_name,
+                            "channel_title": channel_title,
+                            "message_date": message.date.isoformat() if message.date else None,
+                            "message_text": message.message or "",
+                            "has_media": has_media,
+                            "image_path": image_path,
+                            "views": message.views or 0,
+                            "forwards": message.forwards or 0,
+                        }
+                        messages.append(msg_dict)
+                        
+                        if image_path and filename in existing_images:
+                            images_skipped += 1
+                        elif image_path:
+                            task = asyncio.create_task(
+                                self._download_image(download_semaphore, message.media, image_path)
+                            )
+                            pending_downloads.append((msg_dict, task))
+                        
+                        # Log progress every 50 messages
+                        if message_count % 50 == 0:
+                            self.logger.info(f"Scraped {message_count} messages from {channel_name}...")
+                        
+                        # Delay between messages to avoid rate limiting
+                        if message_delay > 0:
+                            await asyncio.sleep(message_delay)
+                    break
                 
-                # Build message dictionary with all required fields
-                msg_dict = {
-                    "message_id": message.id,
-                    "channel_name": channel_name,
-                    "channel_title": channel_title,
-                    "message_date": message.date.isoformat() if message.date else None,
-                    "message_text": message.message or "",
-                    "has_media": has_media,
-                    "image_path": image_path,
-                    "views": message.views or 0,
-                    "forwards": message.forwards or 0,
-                }
-                messages.append(msg_dict)
-                
-                # Log progress every 50 messages
-                if message_count % 50 == 0:
-                    self.logger.info(f"Scraped {message_count} messages from {channel_name}...")
-                
-                # Delay between messages to avoid rate limiting
-                if message_delay > 0:
-                    await asyncio.sleep(message_delay)
-        
-        except FloodWaitError as e:
-            wait_seconds = int(getattr(e, "seconds", 0) or 60)
-            error_msg = f"Rate limit hit for {channel}. Waiting {wait_seconds} seconds"
-            self.logger.warning(error_msg)
-            self.stats["errors"].append({
-                "channel": channel,
-                "error": "FloodWaitError",
-                "wait_seconds": wait_seconds
-            })
-            await asyncio.sleep(wait_seconds)
-            # Log that we hit rate limit but continue with what we have
-            self.logger.info(f"Rate limit wait complete. Continuing with {len(messages)} messages collected so far.")
+                except FloodWaitError as e:
+                    # Telethon sleeps through waits under its flood_sleep_threshold
+                    # itself; anything reaching here is longer than that
+                    flood_waits += 1
+                    wait_seconds = int(getattr(e, "seconds", 0) or 60)
+                    self.stats["errors"].append({
+                        "channel": channel,
+                        "error": "FloodWaitError",
+                        "wait_seconds": wait_seconds
+                    })
+                    
+                    if wait_seconds > FLOOD_WAIT_MAX_SECONDS or flood_waits > FLOOD_WAIT_MAX_RETRIES:
+                        # Keep what we have and free the slot for other channels;
+                        # the next run picks up from the last saved message
+                        self.logger.warning(
+                            f"Rate limit hit for {channel} ({wait_seconds}s wait). "
+                            f"Deferring the rest of the channel with {len(messages)} messages collected."
+                        )
+                        break
+                    
+                    # Jitter keeps parallel channels from resuming in lockstep
+                    delay = wait_seconds + random.uniform(0, FLOOD_WAIT_JITTER_SECONDS)
+                    self.logger.warning(
+                        f"Rate limit hit for {channel}. Waiting {delay:.0f} seconds before resuming"
+                    )
+                    await asyncio.sleep(delay)
         
         except (ConnectionError, OSError) as e:
             error_msg = f"Network error while scraping {channel}: {str(e)}"
             self.logger.error(error_msg)
             self.stats["errors"].append({"channel": channel, "error": error_msg})
+            await self._finish_downloads(pending_downloads, cancel=True)
             return []
         
         except Exception as e:
             error_msg = f"Unexpected error scraping {channel}: {str(e)}"
             self.logger.error(error_msg, exc_info=True)
             self.stats["errors"].append({"channel": channel, "error": error_msg})
+            await self._finish_downloads(pending_downloads, cancel=True)
             return []
         
+        images_downloaded = await self._finish_downloads(pending_downloads)
+        
         # Save to JSON file: data/raw/telegram_messages/YYYY-MM-DD/channel_name.json
         json_path = json_dir / f"{channel_name}.json"
         try:
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(messages, f, ensure_ascii=False, indent=2)
+            # Serialized and written off the event loop so the other channels
+            # being scraped keep making progress
+            await asyncio.to_thread(_write_json, json_path, messages)
             
             self.logger.info(
                 f"Finished scraping {channel_name}: "
-                f"{len(messages)} messages, {images_downloaded} images downloaded. "
+                f"{len(messages)} messages, {images_downloaded} images downloaded, "
+                f"{images_skipped} already on disk. "
                 f"Saved to {json_path}"
             )
             
@@ -242,6 +344,7 @@ class TelegramScraper:
             })
             self.stats["total_messages"] += len(messages)
             self.stats["total_images"] += images_downloaded
+            self.stats["images_skipped"] += images_skipped
             
         except Exception as e:
             error_msg = f"Error saving JSON file for {channel_name}: {str(e)}"
@@ -250,44 +353,150 @@ class TelegramScraper:
         
         return messages
     
+    def _last_scraped_id(self, channel_name: str, today: str) -> int:
+        """
+        Return the newest message_id saved for a channel before today
+        
+        Today's partition is left out so a same-day re-run rewrites the
+        whole day's file instead of only what arrived since the last run.
+        
+        Args:
+            channel_name: Channel name without the @
+            today: YYYY-MM-DD partition being written
+            
+        Returns:
+            Highest saved message_id, or 0 if the channel has no earlier data
+        """
+        messages_root = self.base_path / "raw" / "telegram_messages"
+        try:
+            with os.scandir(messages_root) as entries:
+                dates = sorted(
+                    (entry.name for entry in entries if entry.is_dir() and entry.name < today),
+                    reverse=True
+                )
+        except FileNotFoundError:
+            return 0
+        
+        # Newest partition that has messages for the channel; incremental
+        # runs with nothing new leave an empty file behind
+        for date in dates:
+            json_path = messages_root / date / f"{channel_name}.json"
+            try:
+                messages = orjson.loads(json_path.read_bytes())
+            except (OSError, orjson.JSONDecodeError):
+                continue
+            if messages:
+                return max(msg["message_id"] for msg in messages)
+        return 0
+    
+    async def _download_image(self, semaphore: asyncio.Semaphore, media, image_path: str):
+        """Download one image, waiting for a free download slot first"""
+        # An interrupted download leaves only the .part file behind, so the
+        # image is fetched again on the next run
+        part_path = f"{image_path}.part"
+        async with semaphore:
+            await self.client.download_media(media, part_path)
+        os.replace(part_path, image_path)
+        self.logger.debug("Downloaded image: %s", image_path)
+    
+    async def _finish_downloads(self, pending: List[tuple], cancel: bool = False) -> int:
+        """
+        Wait for background image downloads and record their outcome
+        
+        A failed download clears image_path on its message, as an inline
+        download failure did.
+        
+        Args:
+            pending: (message dict, download task) pairs
+            cancel: Cancel the downloads instead of waiting for them
+            
+        Returns:
+            Number of images downloaded
+        """
+        if cancel:
+            for _, task in pending:
+                task.cancel()
+        
+        outcomes = await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+        
+        downloaded = 0
+        for (msg_dict, _), outcome in zip(pending, outcomes):
+            if isinstance(outcome, BaseException):
+                if not cancel:
+                    self.logger.warning(
+                        f"Failed to download image for message {msg_dict['message_id']}: {outcome}"
+                    )
+                msg_dict["image_path"] = None
+            else:
+                downloaded += 1
+        return downloaded
+    
     async def scrape_channels(
         self,
         channels: List[str],
         limit: int = 1000,
-        channel_delay: float = 3.0
+        channel_delay: float = 3.0,
+        max_concurrency: int = 3,
+        message_delay: float = 0.0,
+        incremental: bool = True
     ) -> Dict[str, List[Dict[str, Any]]]:
         """
         Scrape multiple Telegram channels
         
+        Channels are scraped concurrently, at most max_concurrency at a
+        time, over the same client connection.
+        
         Args:
             channels: List of channel usernames or URLs
             limit: Maximum messages per channel
-            channel_delay: Delay between channels in seconds
+            channel_delay: Delay in seconds before a slot picks up the next channel
+            max_concurrency: Maximum number of channels scraped at once
+            message_delay: Optional delay between messages in seconds
+            incremental: Only fetch messages newer than earlier runs saved
             
         Returns:
             Dictionary mapping channel names to message lists
         """
-        results = {}
         total_channels = len(channels)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        # One partition for the whole run, even if it crosses midnight
+        today = datetime.now().strftime("%Y-%m-%d")
         
         self.logger.info(f"Starting scrape of {total_channels} channels")
         self.logger.info(f"Channels: {', '.join(channels)}")
         
-        for idx, channel in enumerate(channels, 1):
-            self.logger.info(f"[{idx}/{total_channels}] Scraping {channel}...")
-            
-            messages = await self.scrape_channel(channel, limit=limit)
-            channel_name = channel.strip("@").replace("https://t.me/", "")
-            results[channel_name] = messages
-            
-            self.logger.info(
-                f"Completed {channel_name}: {len(messages)} messages scraped"
-            )
-            
-            # Delay between channels to avoid rate limiting
-            if channel_delay > 0 and idx < total_channels:
-                self.logger.info(f"Waiting {channel_delay} seconds before next channel...")
-                await asyncio.sleep(channel_delay)
+        # Connect once up front so the concurrent scrapes don't race to
+        # open the connection
+        await self.start()
+        
+        async def scrape_one(idx: int, channel: str):
+            async with semaphore:
+                self.logger.info(f"[{idx}/{total_channels}] Scraping {channel}...")
+                
+                messages = await self.scrape_channel(
+                    channel,
+                    limit=limit,
+                    message_delay=message_delay,
+                    today=today,
+                    incremental=incremental
+                )
+                channel_name = channel.strip("@").replace("https://t.me/", "")
+                
+                self.logger.info(
+                    f"Completed {channel_name}: {len(messages)} messages scraped"
+                )
+                
+                # Delay before this slot starts another channel to avoid rate limiting
+                if channel_delay > 0 and idx < total_channels:
+                    self.logger.info(f"Waiting {channel_delay} seconds before next channel...")
+                    await asyncio.sleep(channel_delay)
+                
+                return channel_name, messages
+        
+        # gather keeps the input order, so results match the channel list
+        results = dict(await asyncio.gather(
+            *(scrape_one(idx, channel) for idx, channel in enumerate(channels, 1))
+        ))
         
         # Log summary
         self._log_summary()
@@ -302,6 +511,7 @@ class TelegramScraper:
         self.logger.info(f"Total channels scraped: {len(self.stats['channels_scraped'])}")
         self.logger.info(f"Total messages: {self.stats['total_messages']}")
         self.logger.info(f"Total images downloaded: {self.stats['total_images']}")
+        self.logger.info(f"Images already on disk: {self.stats['images_skipped']}")
         self.logger.info(f"Total errors: {len(self.stats['errors'])}")
         
         if self.stats['channels_scraped']:
@@ -319,6 +529,20 @@ class TelegramScraper:
         
         self.logger.info("=" * 60)
     
+    async def start(self, **kwargs):
+        """
+        Connect and sign in the Telegram client once
+        
+        Later calls return without touching the client until close().
+        
+        Args:
+            **kwargs: Passed to TelegramClient.start (e.g. phone)
+        """
+        async with self._start_lock:
+            if not self._started:
+                await self.client.start(**kwargs)
+                self._started = True
+    
     async def close(self):
         """Close the Telegram client"""
         try:
@@ -326,12 +550,14 @@ class TelegramScraper:
                 await self.client.disconnect()
         except Exception as e:
             self.logger.warning(f"Error during disconnect: {e}")
+        self._started = False
 
 
 async def scrape_all_channels(
     channels: List[str],
     base_path: str = "data",
-    limit: int = 1000
+    limit: int = 1000,
+    max_concurrency: int = 3
 ) -> Dict[str, List[Dict[str, Any]]]:
     """
     Convenience function to scrape all channels
@@ -340,13 +566,16 @@ async def scrape_all_channels(
         channels: List of channel usernames
         base_path: Base directory for data storage
         limit: Maximum messages per channel
+        max_concurrency: Maximum number of channels scraped at once
         
     Returns:
         Dictionary mapping channel names to message lists
     """
     scraper = TelegramScraper(base_path=base_path)
     try:
-        results = await scraper.scrape_channels(channels, limit=limit)
+        results = await scraper.scrape_channels(
+            channels, limit=limit, max_concurrency=max_concurrency
+        )
         return results
     finally:
         await scraper.close()
@@ -387,8 +616,8 @@ Examples:
     parser.add_argument(
         "--message-delay",
         type=float,
-        default=1.0,
-        help="Delay between messages in seconds (default: 1.0)"
+        default=0.0,
+        help="Delay between messages in seconds (default: 0)"
     )
     parser.add_argument(
         "--channel-delay",
@@ -396,26 +625,46 @@ Examples:
         default=3.0,
         help="Delay between channels in seconds (default: 3.0)"
     )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=3,
+        help="Maximum number of channels scraped at once (default: 3)"
+    )
     parser.add_argument(
         "--base-path",
         type=str,
         default="data",
         help="Base directory for data storage (default: data)"
     )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-fetch every message instead of only those newer than earlier runs"
+    )
     
     args = parser.parse_args()
     
     # Create scraper and run
     scraper = TelegramScraper(base_path=args.base_path)
     
-    try:
-        results = asyncio.run(
-            scraper.scrape_channels(
+    async def run():
+        # Scrape and disconnect on one event loop; the client is bound to
+        # the loop it connected on
+        try:
+            return await scraper.scrape_channels(
                 channels=args.channels,
                 limit=args.limit,
-                channel_delay=args.channel_delay
+                channel_delay=args.channel_delay,
+                max_concurrency=args.max_concurrency,
+                message_delay=args.message_delay,
+                incremental=not args.full
             )
-        )
+        finally:
+            await scraper.close()
+    
+    try:
+        results = asyncio.run(run())
         
         total = sum(len(msgs) for msgs in results.values())
         print(f"\n✓ Scraping complete: {total} total messages from {len(results)} channels")
@@ -426,5 +675,3 @@ Examples:
     except Exception as e:
         print(f"\n\nFatal error: {e}")
         scraper.logger.error(f"Fatal error: {e}", exc_info=True)
-    finally:
-        asyncio.run(scraper.close())
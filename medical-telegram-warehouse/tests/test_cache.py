@@ -0,0 +1,138 @@
+"""
+Unit tests for API response cache keys
+"""
+import asyncio
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.decorator import cache
+from redis import asyncio as aioredis
+
+from api import schemas
+from api.cache import (
+    CACHE_PREFIX,
+    ORJSONCoder,
+    ObservedRedisBackend,
+    RawJSONCoder,
+    normalize_search_query,
+    request_key_builder,
+    search_key_builder,
+)
+
+
+def _search():
+    pass
+
+
+def test_normalize_search_query():
+    """Test case and whitespace folding of search queries"""
+    assert normalize_search_query("  PARACETAMOL   500mg ") == "paracetamol 500mg"
+
+
+def test_search_key_builder_shares_equivalent_queries():
+    """Test that equivalent queries map to one key and limits stay distinct"""
+    FastAPICache.init(InMemoryBackend(), prefix=CACHE_PREFIX)
+    try:
+        def build(**kwargs):
+            return asyncio.run(search_key_builder(_search, kwargs=kwargs))
+
+        key = build(query=" Paracetamol", limit=20)
+        assert key == build(query="PARACETAMOL ", limit=20)
+        assert key != build(query="paracetamol", limit=50)
+        assert key.startswith(f"{CACHE_PREFIX}:")
+    finally:
+        FastAPICache.reset()
+
+
+def test_orjson_coder_round_trip():
+    """Test that cached response models decode to JSON-compatible data"""
+    channel = schemas.ChannelStats.model_construct(
+        channel_name="chemed123",
+        channel_type="Other",
+        total_posts=76,
+        messages_with_media=72,
+        media_ratio=0.95,
+        avg_views=1418.82,
+        avg_forwards=3.16,
+        first_post_date=datetime(2022, 9, 5, 8, 35, 59),
+        last_post_date=None
+    )
+
+    decoded = ORJSONCoder.decode(ORJSONCoder.encode([channel]))
+
+    assert decoded[0]["channel_name"] == "chemed123"
+    assert decoded[0]["first_post_date"] == "2022-09-05T08:35:59"
+    assert schemas.ChannelStats(**decoded[0]).first_post_date == datetime(2022, 9, 5, 8, 35, 59)
+
+
+def test_raw_json_coder_serves_cached_bytes():
+    """Test that cache hits return the stored JSON with the cache headers"""
+    app = FastAPI()
+    calls = []
+
+    @app.get("/payload")
+    @cache(expire=60, coder=RawJSONCoder)
+    async def payload():
+        calls.append(1)
+        return {"total_images_analyzed": 3, "top_detected_objects": [{"object_name": "bottle", "count": 2}]}
+
+    FastAPICache.init(InMemoryBackend(), prefix=CACHE_PREFIX, key_builder=request_key_builder)
+    try:
+        client = TestClient(app)
+        first = client.get("/payload")
+        second = client.get("/payload")
+
+        assert len(calls) == 1
+        assert second.json() == first.json()
+        assert second.headers["content-type"] == "application/json"
+        assert second.headers["ETag"] == first.headers["ETag"]
+    finally:
+        FastAPICache.reset()
+
+
+# Nothing listens on port 1, so every Redis call fails to connect
+UNREACHABLE_REDIS_URL = "redis://127.0.0.1:1/0"
+
+
+def test_cached_endpoint_survives_unreachable_redis():
+    """Test that a Redis outage falls through to the handler instead of a 500"""
+    app = FastAPI()
+    calls = []
+
+    @app.get("/payload")
+    @cache(expire=60)
+    async def payload():
+        calls.append(1)
+        return {"status": "ok"}
+
+    FastAPICache.init(
+        ObservedRedisBackend(aioredis.from_url(UNREACHABLE_REDIS_URL)),
+        prefix=CACHE_PREFIX,
+        coder=ORJSONCoder,
+        key_builder=request_key_builder,
+    )
+    try:
+        response = TestClient(app).get("/payload")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+        assert calls == [1]
+    finally:
+        FastAPICache.reset()
+
+
+def test_search_key_builder_survives_unreachable_redis():
+    """Test that search keys fall back to version 0 when Redis is down"""
+    FastAPICache.init(
+        ObservedRedisBackend(aioredis.from_url(UNREACHABLE_REDIS_URL)),
+        prefix=CACHE_PREFIX,
+    )
+    try:
+        key = asyncio.run(search_key_builder(_search, kwargs={"query": "paracetamol", "limit": 20}))
+
+        assert key.startswith(f"{CACHE_PREFIX}:0:")
+    finally:
+        FastAPICache.reset()
@@ -0,0 +1,37 @@
+"""
+Unit tests for the Dagster pipeline helpers
+"""
+import pytest
+
+pytest.importorskip("dagster")
+
+from src.orchestration.pipeline import _count_jpgs, _latest_date_dir
+
+
+def test_latest_date_dir(tmp_path):
+    """Test the newest date directory is picked and files are ignored"""
+    for name in ("2024-01-09", "2024-01-10", "2023-12-31"):
+        (tmp_path / name).mkdir()
+    (tmp_path / "2024-02-01.json").write_text("[]")
+
+    assert _latest_date_dir(tmp_path) == tmp_path / "2024-01-10"
+
+
+def test_latest_date_dir_empty_or_missing(tmp_path):
+    """Test None is returned when there is no date directory"""
+    assert _latest_date_dir(tmp_path) is None
+    assert _latest_date_dir(tmp_path / "missing") is None
+
+
+def test_count_jpgs(tmp_path):
+    """Test only .jpg files are counted, not other files or directories"""
+    for name in ("1.jpg", "2.jpg", "3.jpg.part", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    (tmp_path / "album.jpg").mkdir()
+
+    assert _count_jpgs(str(tmp_path)) == 2
+
+
+def test_count_jpgs_missing_directory(tmp_path):
+    """Test a channel without an image directory counts as 0"""
+    assert _count_jpgs(str(tmp_path / "missing")) == 0
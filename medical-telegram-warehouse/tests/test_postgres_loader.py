@@ -0,0 +1,21 @@
+"""
+Unit tests for the PostgreSQL loader
+"""
+from src.loader.postgres_loader import _copy_text_value
+
+
+def test_copy_text_value_null():
+    """Test None becomes COPY's NULL marker"""
+    assert _copy_text_value(None) == "\\N"
+
+
+def test_copy_text_value_escapes_delimiters():
+    """Test backslashes, tabs and line breaks are escaped for COPY text format"""
+    assert _copy_text_value("a\\b\tc\nd\re") == "a\\\\b\\tc\\nd\\re"
+
+
+def test_copy_text_value_plain():
+    """Test other values pass through as text"""
+    assert _copy_text_value("Paracetamol 500mg") == "Paracetamol 500mg"
+    assert _copy_text_value(42) == "42"
+    assert _copy_text_value("\\N") == "\\\\N"
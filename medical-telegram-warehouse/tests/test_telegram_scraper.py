@@ -0,0 +1,43 @@
+"""
+Unit tests for the Telegram scraper
+"""
+import json
+
+import pytest
+
+pytest.importorskip("telethon")
+
+from src.scraper.telegram_scraper import TelegramScraper
+
+
+def _scraper(base_path):
+    # _last_scraped_id only reads base_path; skip the credential checks
+    scraper = TelegramScraper.__new__(TelegramScraper)
+    scraper.base_path = base_path
+    return scraper
+
+
+def _write_partition(base_path, date, channel_name, message_ids):
+    partition = base_path / "raw" / "telegram_messages" / date
+    partition.mkdir(parents=True, exist_ok=True)
+    messages = [{"message_id": message_id} for message_id in message_ids]
+    (partition / f"{channel_name}.json").write_text(json.dumps(messages))
+
+
+def test_last_scraped_id_skips_today_and_empty_partitions(tmp_path):
+    """Test the newest earlier non-empty partition supplies the resume point"""
+    _write_partition(tmp_path, "2024-01-01", "chemed123", [5, 7])
+    _write_partition(tmp_path, "2024-01-02", "chemed123", [12, 9])
+    _write_partition(tmp_path, "2024-01-03", "chemed123", [])
+    _write_partition(tmp_path, "2024-01-04", "chemed123", [20])
+    _write_partition(tmp_path, "2024-01-03", "tikvahpharma", [99])
+
+    assert _scraper(tmp_path)._last_scraped_id("chemed123", "2024-01-04") == 12
+
+
+def test_last_scraped_id_without_history(tmp_path):
+    """Test a channel with no earlier partitions starts from 0"""
+    assert _scraper(tmp_path)._last_scraped_id("chemed123", "2024-01-04") == 0
+
+    _write_partition(tmp_path, "2024-01-04", "chemed123", [20])
+    assert _scraper(tmp_path)._last_scraped_id("chemed123", "2024-01-04") == 0
@@ -0,0 +1,36 @@
+"""
+Unit tests for YOLO detection classification
+"""
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("ultralytics")
+
+from src.enrichment.yolo_detector import YOLODetector
+
+PERSON = {'class_id': 0, 'confidence': 0.9}
+BOTTLE = {'class_id': 39, 'confidence': 0.6}
+CHAIR = {'class_id': 56, 'confidence': 0.3}
+
+# _summarize only reads class attributes, so skip loading the model
+detector = YOLODetector.__new__(YOLODetector)
+
+
+@pytest.mark.parametrize("detections, category, has_person, has_product", [
+    ([CHAIR], 'other', False, False),
+    ([BOTTLE, CHAIR], 'product_display', False, True),
+    ([PERSON, CHAIR], 'lifestyle', True, False),
+    ([PERSON, BOTTLE], 'promotional', True, True),
+])
+def test_summarize_categories(detections, category, has_person, has_product):
+    """Test each person/product combination maps to its category"""
+    result = detector._summarize(detections)
+
+    assert result[0] == category
+    assert result[1] == pytest.approx(sum(d['confidence'] for d in detections) / len(detections))
+    assert result[2:] == (has_person, has_product)
+
+
+def test_summarize_no_detections():
+    """Test an image without detections is 'other' with zero confidence"""
+    assert detector._summarize([]) == ('other', 0.0, False, False)